@@ -4,13 +4,40 @@ Computes precision, recall, and F1 scores for extracted invoice fields.
 Based on standard information extraction evaluation methodologies.
 """
 
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
+from functools import partial, singledispatch
+from operator import attrgetter
 from typing import Any
 
+import numpy as np
+import numpy.typing as npt
+
 from services.extraction.schema import InvoiceData
 
+# Comparison kind for each evaluated field. Values are type-checked by InvoiceData,
+# so each field can be compared column-wise without per-value type dispatch.
+_FIELD_KINDS: dict[str, str] = {
+    "invoice_number": "string",
+    "invoice_date": "date",
+    "due_date": "date",
+    "supplier_name": "string",
+    "supplier_address": "string",
+    "customer_name": "string",
+    "subtotal": "numeric",
+    "tax_amount": "numeric",
+    "total_amount": "numeric",
+    "currency": "string",
+}
+_EVALUATED_FIELDS: tuple[str, ...] = tuple(_FIELD_KINDS)
+_get_evaluated_values = attrgetter(*_EVALUATED_FIELDS)
+
+# Below this many samples, thread pool overhead outweighs any parallel speedup
+_PARALLEL_MIN_SAMPLES = 1024
+
 
 @dataclass
 class FieldMetrics:
@@ -31,9 +58,25 @@ class EvaluationReport:
     total_samples: int
 
 
+def _normalize_string(s: str) -> str:
+    """Normalize string for case-insensitive, whitespace-tolerant comparison."""
+    s = s.strip().lower()
+    s = s.replace("\n", ", ")  # Newlines to commas (common in addresses)
+    return " ".join(s.split())  # Collapse whitespace
+
+
+def _looks_like_date(s: str) -> bool:
+    """Check if string is shaped like a YYYY-MM-DD date."""
+    return len(s) == 10 and s[4:5] == "-"
+
+
+@singledispatch
 def calculate_field_match(expected: Any, predicted: Any) -> bool:
     """Check if extracted field matches expected value.
 
+    Dispatches on the type of the expected value; each registered variant
+    only performs the comparison its type needs.
+
     Args:
         expected: Ground truth value
         predicted: Extracted value
@@ -41,67 +84,237 @@ def calculate_field_match(expected: Any, predicted: Any) -> bool:
     Returns:
         True if values match (with tolerance for numeric fields)
     """
+    if predicted is None:
+        return False
+
+    # Direct comparison for other types
+    return bool(expected == predicted)
+
+
+@calculate_field_match.register
+def _match_none(expected: None, predicted: Any) -> bool:
     # Both None
-    if expected is None and predicted is None:
-        return True
+    return predicted is None
 
-    # One is None
-    if expected is None or predicted is None:
-        return False
 
+@calculate_field_match.register
+def _match_numeric(expected: int | float | Decimal, predicted: Any) -> bool:
     # Numeric comparison (with small tolerance for floating point)
-    if isinstance(expected, int | float | Decimal) and isinstance(predicted, int | float | Decimal):
+    if isinstance(predicted, int | float | Decimal):
         return abs(float(expected) - float(predicted)) < 0.01
+    if predicted is None:
+        return False
+    return bool(expected == predicted)
+
 
+@calculate_field_match.register
+def _match_date(expected: date, predicted: Any) -> bool:
     # Date comparison - handle string vs date object
-    def normalize_date(val: Any) -> str | None:
-        """Convert date or date string to YYYY-MM-DD string."""
-        if isinstance(val, date):
-            return val.isoformat()
-        if isinstance(val, str):
-            # Already in YYYY-MM-DD format or similar
-            return val.strip()
-        return None
-
-    # Check if either value looks like a date (date object or YYYY-MM-DD string)
-    is_expected_date = isinstance(expected, date) or (
-        isinstance(expected, str) and len(expected) == 10 and expected[4:5] == "-"
-    )
-    is_predicted_date = isinstance(predicted, date) or (
-        isinstance(predicted, str) and len(predicted) == 10 and str(predicted)[4:5] == "-"
-    )
+    if isinstance(predicted, date):
+        return expected.isoformat() == predicted.isoformat()
+    if isinstance(predicted, str) and _looks_like_date(predicted):
+        return expected.isoformat() == predicted.strip()
+    if predicted is None:
+        return False
+    return bool(expected == predicted)
 
-    if is_expected_date and is_predicted_date:
-        exp_str = normalize_date(expected)
-        pred_str = normalize_date(predicted)
-        return exp_str == pred_str
 
-    # String comparison (case-insensitive, stripped, normalized whitespace)
-    if isinstance(expected, str) and isinstance(predicted, str):
-        # Normalize: replace newlines with commas, collapse multiple spaces
-        def normalize_string(s: str) -> str:
-            s = s.strip().lower()
-            s = s.replace("\n", ", ")  # Newlines to commas (common in addresses)
-            s = " ".join(s.split())  # Collapse whitespace
-            return s
+@calculate_field_match.register
+def _match_string(expected: str, predicted: Any) -> bool:
+    if isinstance(predicted, str):
+        # Both look like dates - compare as YYYY-MM-DD
+        if _looks_like_date(expected) and _looks_like_date(predicted):
+            return expected.strip() == predicted.strip()
+        # String comparison (case-insensitive, stripped, normalized whitespace)
+        return _normalize_string(expected) == _normalize_string(predicted)
+    if isinstance(predicted, date) and _looks_like_date(expected):
+        return expected.strip() == predicted.isoformat()
+    if predicted is None:
+        return False
+    return bool(expected == predicted)
 
-        return normalize_string(expected) == normalize_string(predicted)
 
-    # Direct comparison for other types
-    return bool(expected == predicted)
+def field_matcher(expected: Any) -> Callable[[Any], bool]:
+    """Specialize calculate_field_match for a fixed expected value.
+
+    Normalizes the expected value once, so comparing many predictions against
+    the same ground truth only normalizes the predicted side.
+
+    Args:
+        expected: Ground truth value
+
+    Returns:
+        Function mapping a predicted value to calculate_field_match(expected, predicted)
+    """
+    if isinstance(expected, str):
+        normalized = _normalize_string(expected)
+        stripped = expected.strip()
+        date_like = _looks_like_date(expected)
+
+        def match_string(predicted: Any) -> bool:
+            if isinstance(predicted, str):
+                if date_like and _looks_like_date(predicted):
+                    return stripped == predicted.strip()
+                return normalized == _normalize_string(predicted)
+            if isinstance(predicted, date) and date_like:
+                return stripped == predicted.isoformat()
+            if predicted is None:
+                return False
+            return bool(expected == predicted)
+
+        return match_string
+
+    if isinstance(expected, int | float | Decimal):
+        # Cast once; the tolerance check then runs on floats, never on Decimals
+        value = float(expected)
+
+        def match_numeric(predicted: Any) -> bool:
+            if isinstance(predicted, int | float | Decimal):
+                return abs(value - float(predicted)) < 0.01
+            if predicted is None:
+                return False
+            return bool(expected == predicted)
+
+        return match_numeric
+
+    return partial(calculate_field_match, expected)
+
+
+def _columnize(samples: Sequence[InvoiceData]) -> list[tuple[Any, ...]]:
+    """Transpose samples into one tuple of values per evaluated field.
+
+    Args:
+        samples: Invoice data samples
+
+    Returns:
+        Value columns in _EVALUATED_FIELDS order
+    """
+    if not samples:
+        return [() for _ in _EVALUATED_FIELDS]
+    return list(zip(*map(_get_evaluated_values, samples), strict=True))
+
+
+def _column_matches(
+    kind: str, exp_values: Sequence[Any], pred_values: Sequence[Any]
+) -> npt.NDArray[np.bool_]:
+    """Compare one field column of expected vs predicted values.
+
+    Equivalent to calling calculate_field_match on every pair where both values
+    are present; entries where either side is None are meaningless and must be
+    masked out by the caller.
+
+    Args:
+        kind: Comparison kind from _FIELD_KINDS
+        exp_values: Expected values for the field (one per sample)
+        pred_values: Predicted values for the field (one per sample)
+
+    Returns:
+        Boolean array of per-sample matches
+    """
+    n = len(exp_values)
+
+    if kind == "numeric":
+        exp_num = np.fromiter(
+            (np.nan if v is None else float(v) for v in exp_values), dtype=np.float64, count=n
+        )
+        pred_num = np.fromiter(
+            (np.nan if v is None else float(v) for v in pred_values), dtype=np.float64, count=n
+        )
+        numeric_matches: npt.NDArray[np.bool_] = np.abs(exp_num - pred_num) < 0.01
+        return numeric_matches
+
+    if kind == "date":
+        exp_ord = np.fromiter(
+            (-1 if v is None else v.toordinal() for v in exp_values), dtype=np.int64, count=n
+        )
+        pred_ord = np.fromiter(
+            (-1 if v is None else v.toordinal() for v in pred_values), dtype=np.int64, count=n
+        )
+        date_matches: npt.NDArray[np.bool_] = exp_ord == pred_ord
+        return date_matches
+
+    # Strings: values that both look like YYYY-MM-DD are compared stripped only,
+    # everything else goes through full normalization.
+    def columnize(
+        values: Sequence[Any],
+    ) -> tuple[npt.NDArray[np.object_], npt.NDArray[np.object_], npt.NDArray[np.bool_]]:
+        normalized = np.empty(n, dtype=object)
+        stripped = np.empty(n, dtype=object)
+        date_like = np.zeros(n, dtype=np.bool_)
+        for i, v in enumerate(values):
+            if v is None:
+                continue
+            normalized[i] = _normalize_string(v)
+            stripped[i] = v.strip()
+            date_like[i] = _looks_like_date(v)
+        return normalized, stripped, date_like
+
+    exp_norm, exp_strip, exp_date = columnize(exp_values)
+    pred_norm, pred_strip, pred_date = columnize(pred_values)
+    matches: npt.NDArray[np.bool_] = np.where(
+        exp_date & pred_date, exp_strip == pred_strip, exp_norm == pred_norm
+    ).astype(np.bool_)
+    return matches
+
+
+def _count_field_outcomes(
+    expected: Sequence[InvoiceData], predicted: Sequence[InvoiceData]
+) -> npt.NDArray[np.int64]:
+    """Count true positives, false positives and false negatives per field.
+
+    Args:
+        expected: Ground truth invoice data
+        predicted: Extracted invoice data (same length as expected)
+
+    Returns:
+        Array of shape (len(_EVALUATED_FIELDS), 3) holding TP, FP, FN per field
+    """
+    counts = np.zeros((len(_EVALUATED_FIELDS), 3), dtype=np.int64)
+    exp_columns = _columnize(expected)
+    pred_columns = _columnize(predicted)
+
+    for i, (field, exp_values, pred_values) in enumerate(
+        zip(_EVALUATED_FIELDS, exp_columns, pred_columns, strict=True)
+    ):
+        kind = _FIELD_KINDS[field]
+
+        exp_present = np.fromiter((v is not None for v in exp_values), dtype=np.bool_)
+        pred_present = np.fromiter((v is not None for v in pred_values), dtype=np.bool_)
+        both_present = exp_present & pred_present
+        matches = _column_matches(kind, exp_values, pred_values)
+
+        # True Positive: both have value and they match
+        true_positives = np.count_nonzero(both_present & matches)
+        # Wrong value counts as both a false positive and a false negative
+        wrong = np.count_nonzero(both_present & ~matches)
+        # False Positive: predicted value but should be None
+        false_positives = wrong + np.count_nonzero(pred_present & ~exp_present)
+        # False Negative: expected value but got None
+        false_negatives = wrong + np.count_nonzero(exp_present & ~pred_present)
+        # True Negative: both None (not counted in metrics)
+
+        counts[i] = (true_positives, false_positives, false_negatives)
+
+    return counts
 
 
 def evaluate_extraction(
-    expected: list[InvoiceData], predicted: list[InvoiceData]
+    expected: list[InvoiceData], predicted: list[InvoiceData], *, n_workers: int = 1
 ) -> EvaluationReport:
     """Evaluate extraction accuracy against ground truth.
 
     Computes precision, recall, and F1 for each invoice field.
     Uses exact matching for structured fields.
 
+    Samples are laid out column-wise (one array per field) so that matching
+    and counting run as NumPy reductions instead of a per-sample Python loop.
+    Large batches can be split into chunks evaluated on a thread pool; the
+    per-chunk counts are summed, so the report does not depend on n_workers.
+
     Args:
         expected: Ground truth invoice data
         predicted: Extracted invoice data
+        n_workers: Worker threads for batches over _PARALLEL_MIN_SAMPLES samples
 
     Returns:
         Evaluation report with per-field and overall metrics
@@ -109,48 +322,24 @@ def evaluate_extraction(
     if len(expected) != len(predicted):
         raise ValueError("Expected and predicted lists must have same length")
 
-    fields = [
-        "invoice_number",
-        "invoice_date",
-        "due_date",
-        "supplier_name",
-        "supplier_address",
-        "customer_name",
-        "subtotal",
-        "tax_amount",
-        "total_amount",
-        "currency",
-    ]
+    if n_workers > 1 and len(expected) > _PARALLEL_MIN_SAMPLES:
+        # Several chunks per worker to even out uneven chunk costs
+        chunk_size = -(-len(expected) // (n_workers * 4))
+        bounds = range(0, len(expected), chunk_size)
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            chunk_counts = pool.map(
+                _count_field_outcomes,
+                (expected[i : i + chunk_size] for i in bounds),
+                (predicted[i : i + chunk_size] for i in bounds),
+            )
+            counts = np.sum(list(chunk_counts), axis=0)
+    else:
+        counts = _count_field_outcomes(expected, predicted)
 
     field_metrics: dict[str, FieldMetrics] = {}
-
-    for field in fields:
-        true_positives = 0
-        false_positives = 0
-        false_negatives = 0
-
-        for exp, pred in zip(expected, predicted, strict=True):
-            exp_value = getattr(exp, field)
-            pred_value = getattr(pred, field)
-
-            # True Positive: both have value and they match
-            if exp_value is not None and pred_value is not None:
-                if calculate_field_match(exp_value, pred_value):
-                    true_positives += 1
-                else:
-                    false_positives += 1  # Predicted wrong value
-                    false_negatives += 1  # Missed correct value
-
-            # False Negative: expected value but got None
-            elif exp_value is not None and pred_value is None:
-                false_negatives += 1
-
-            # False Positive: predicted value but should be None
-            elif exp_value is None and pred_value is not None:
-                false_positives += 1
-
-            # True Negative: both None (not counted in metrics)
-
+    for field, (true_positives, false_positives, false_negatives) in zip(
+        _EVALUATED_FIELDS, counts.tolist(), strict=True
+    ):
         # Calculate metrics
         precision = (
             true_positives / (true_positives + false_positives)
@@ -13,6 +13,7 @@ Output format matches data/gold/invoices.json schema.
 import csv
 import json
 import logging
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
@@ -47,36 +48,52 @@ def parse_csv_file(csv_path: Path) -> list[ExternalInvoiceRecord]:
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
 
-    records: list[ExternalInvoiceRecord] = []
-
     with open(csv_path, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-
-        # Validate columns
-        expected_columns = {"File Name", "Json Data", "OCRed Text"}
-        if not expected_columns.issubset(set(reader.fieldnames or [])):
-            raise ValueError(
-                f"CSV missing required columns. Expected: {expected_columns}, "
-                f"Got: {reader.fieldnames}"
-            )
-
-        for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
-            try:
-                json_data = json.loads(row["Json Data"])
-                record = ExternalInvoiceRecord(
-                    file_name=row["File Name"],
-                    json_data=json_data,
-                    ocr_text=row["OCRed Text"],
-                )
-                records.append(record)
-            except json.JSONDecodeError as e:
-                logger.warning(f"Row {row_num}: Invalid JSON, skipping. Error: {e}")
-                continue
+        records = _parse_csv_stream(f)
 
     logger.info(f"Parsed {len(records)} records from {csv_path.name}")
     return records
 
 
+def _parse_csv_stream(lines: Iterable[str]) -> list[ExternalInvoiceRecord]:
+    """Parse external dataset CSV content from an open text stream.
+
+    Args:
+        lines: CSV text, e.g. an open file or io.StringIO
+
+    Returns:
+        List of ExternalInvoiceRecord objects
+
+    Raises:
+        ValueError: If CSV format is invalid
+    """
+    records: list[ExternalInvoiceRecord] = []
+    reader = csv.DictReader(lines)
+
+    # Validate columns
+    expected_columns = {"File Name", "Json Data", "OCRed Text"}
+    if not expected_columns.issubset(set(reader.fieldnames or [])):
+        raise ValueError(
+            f"CSV missing required columns. Expected: {expected_columns}, "
+            f"Got: {reader.fieldnames}"
+        )
+
+    for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
+        try:
+            json_data = json.loads(row["Json Data"])
+            record = ExternalInvoiceRecord(
+                file_name=row["File Name"],
+                json_data=json_data,
+                ocr_text=row["OCRed Text"],
+            )
+            records.append(record)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Row {row_num}: Invalid JSON, skipping. Error: {e}")
+            continue
+
+    return records
+
+
 def parse_date(date_str: str) -> str | None:
     """Parse date string to ISO format (YYYY-MM-DD).
 
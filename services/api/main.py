@@ -691,8 +691,10 @@ async def get_batch_status(batch_id: str) -> BatchStatusResponse:
     failed = 0
     pending = 0
 
-    for job_id in job_ids:
-        job_data = await pool.pool.get(f"job:{job_id}")
+    # Fetch every job record in one round-trip (MGET) rather than one GET per job
+    job_records = await pool.pool.mget([f"job:{job_id}" for job_id in job_ids]) if job_ids else []
+
+    for job_data in job_records:
         if job_data:
             job_dict = json.loads(job_data)
             job_status = job_dict.get("status", "unknown")
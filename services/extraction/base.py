@@ -13,6 +13,7 @@ Design follows existing patterns:
 """
 
 from abc import ABC, abstractmethod
+from typing import ClassVar
 
 from pydantic import BaseModel
 
@@ -48,6 +49,10 @@ class ExtractionProvider(ABC):
     - LocalExtractionProvider: Uses local models (self-hosted)
     """
 
+    # Settings fields the provider reads. The factory reuses one provider per
+    # distinct values of these fields; None means every field is compared.
+    settings_fields: ClassVar[tuple[str, ...] | None] = None
+
     def __init__(self, settings: Settings) -> None:
         """Initialize provider with settings.
 
@@ -11,6 +11,9 @@ type safety and enabling easy addition of new providers.
 """
 
 import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
 
 from services.extraction.base import ExtractionProvider
 from services.extraction.local_provider import LocalExtractionProvider
@@ -34,6 +37,9 @@ class ProviderRegistry:
         "ollama": OllamaExtractionProvider,
     }
 
+    # Pre-formatted provider list for error messages, refreshed on (un)registration
+    _available: str = ", ".join(_providers)
+
     @classmethod
     def register(cls, name: str, provider_class: type[ExtractionProvider]) -> None:
         """Register a new provider.
@@ -43,8 +49,23 @@ class ProviderRegistry:
             provider_class: Provider class implementing ExtractionProvider interface
         """
         cls._providers[name] = provider_class
+        cls._available = ", ".join(cls._providers)
         logger.info(f"Registered extraction provider: {name}")
 
+    @classmethod
+    def unregister(cls, name: str) -> None:
+        """Remove a provider from the registry.
+
+        Args:
+            name: Provider identifier
+
+        Raises:
+            KeyError: If provider not found in registry
+        """
+        del cls._providers[name]
+        cls._available = ", ".join(cls._providers)
+        logger.info(f"Unregistered extraction provider: {name}")
+
     @classmethod
     def get_provider_class(cls, name: str) -> type[ExtractionProvider]:
         """Get provider class by name.
@@ -58,12 +79,12 @@ class ProviderRegistry:
         Raises:
             ValueError: If provider not found in registry
         """
-        if name not in cls._providers:
-            available = ", ".join(cls._providers.keys())
+        provider_class = cls._providers.get(name)
+        if provider_class is None:
             raise ValueError(
-                f"Unknown extraction provider: '{name}'. " f"Available providers: {available}"
+                f"Unknown extraction provider: '{name}'. " f"Available providers: {cls._available}"
             )
-        return cls._providers[name]
+        return provider_class
 
     @classmethod
     def list_providers(cls) -> list[str]:
@@ -75,12 +96,32 @@ class ProviderRegistry:
         return list(cls._providers.keys())
 
 
+@dataclass(frozen=True, slots=True)
+class _ProviderKey:
+    """Cache key of a provider: its class and the settings values it reads.
+
+    Carries the full Settings for construction; only the class and values
+    take part in hashing and equality.
+    """
+
+    provider_class: type[ExtractionProvider]
+    values: tuple[Any, ...]
+    settings: Settings = field(compare=False)
+
+
 def create_extraction_service(settings: Settings) -> ExtractionProvider:
     """Factory function to create extraction service based on configuration.
 
     Reads settings.extraction_provider and instantiates the appropriate provider.
     Logs warnings if the provider is not available (e.g., missing API key).
 
+    Providers are memoized per provider name and the values of the settings
+    fields it reads (ExtractionProvider.settings_fields), so callers that
+    resolve the service per job or per request reuse one instance (and its HTTP
+    client). Availability is therefore checked, and the "not fully available"
+    warning emitted, once per configuration: a provider created before e.g. an
+    API key was set is reused as is (OpenAI still checks the key per call).
+
     Args:
         settings: Application settings with extraction_provider field
 
@@ -97,9 +138,26 @@ def create_extraction_service(settings: Settings) -> ExtractionProvider:
     """
     provider_name = settings.extraction_provider
     provider_class = ProviderRegistry.get_provider_class(provider_name)
+    fields = provider_class.settings_fields or tuple(Settings.model_fields)
+    values = tuple(getattr(settings, name) for name in fields)
+    return _create_provider(_ProviderKey(provider_class, values, settings))
+
+
+@lru_cache(maxsize=8)
+def _create_provider(key: _ProviderKey) -> ExtractionProvider:
+    """Instantiate the provider for a configuration (cached per key).
+
+    Args:
+        key: Provider class, relevant settings values and the full Settings
+
+    Returns:
+        Configured extraction provider instance
+    """
+    settings = key.settings
+    provider_name = settings.extraction_provider
 
     # Instantiate provider
-    provider = provider_class(settings)
+    provider = key.provider_class(settings)
 
     # Check availability and log warning if not configured
     if not provider.is_available():
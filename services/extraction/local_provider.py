@@ -22,6 +22,7 @@ import logging
 import re
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
+from importlib.util import find_spec
 from typing import Any
 
 from services.extraction.base import ExtractionProvider, ExtractionResult
@@ -44,6 +45,8 @@ class LocalExtractionProvider(ExtractionProvider):
     - Graceful error handling with detailed logging
     """
 
+    settings_fields = ("local_model_device", "local_model_precision", "local_model_warmup")
+
     def __init__(self, settings: Settings) -> None:
         """Initialize local extraction provider.
 
@@ -163,16 +166,13 @@ class LocalExtractionProvider(ExtractionProvider):
     def is_available(self) -> bool:
         """Check if local model can be loaded.
 
+        Looks the dependencies up without importing them, so checking
+        availability does not pay torch's import cost.
+
         Returns:
             True if dependencies are installed and model can load
         """
-        try:
-            import torch  # noqa: F401
-            import transformers  # noqa: F401
-
-            return True
-        except ImportError:
-            return False
+        return find_spec("torch") is not None and find_spec("transformers") is not None
 
     def extract_invoice_fields(self, ocr_text: str) -> ExtractionResult:
         """Extract invoice fields using local Donut model.
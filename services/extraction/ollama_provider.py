@@ -7,10 +7,15 @@ Requires Ollama server running on localhost:11434.
 See: https://ollama.ai/
 """
 
+import hashlib
 import json
 import logging
-import re
-from typing import Any
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from types import TracebackType
+from typing import Any, Self
 
 import httpx
 from tenacity import (
@@ -26,6 +31,139 @@ from services.shared.config import Settings
 
 logger = logging.getLogger(__name__)
 
+# orjson is optional: it decodes model output faster than stdlib json
+_json_loads: Callable[[str], Any]
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    _json_loads = json.loads
+
+# For objects followed by other text, which orjson cannot decode partially
+_JSON_DECODER = json.JSONDecoder()
+
+# Schema definition for JSON output
+_SCHEMA = (
+    '{"invoice_number": string|null, "invoice_date": string|null (YYYY-MM-DD), '
+    '"due_date": string|null, "supplier_name": string|null, '
+    '"supplier_address": string|null, "customer_name": string|null, '
+    '"subtotal": number|null, "tax_amount": number|null, '
+    '"total_amount": number|null, "currency": string|null}'
+)
+
+# Structured output format for /api/generate: Ollama constrains generation to this
+# JSON schema (same fields as _SCHEMA), so responses are bare, valid JSON objects
+_OUTPUT_PROPERTIES: dict[str, Any] = {
+    "invoice_number": {"type": ["string", "null"]},
+    "invoice_date": {"type": ["string", "null"], "format": "date"},
+    "due_date": {"type": ["string", "null"], "format": "date"},
+    "supplier_name": {"type": ["string", "null"]},
+    "supplier_address": {"type": ["string", "null"]},
+    "customer_name": {"type": ["string", "null"]},
+    "subtotal": {"type": ["number", "null"]},
+    "tax_amount": {"type": ["number", "null"]},
+    "total_amount": {"type": ["number", "null"]},
+    "currency": {"type": ["string", "null"]},
+}
+_OUTPUT_FORMAT: dict[str, Any] = {
+    "type": "object",
+    "properties": _OUTPUT_PROPERTIES,
+    "required": list(_OUTPUT_PROPERTIES),  # Missing fields come back as null
+}
+
+# Example 1: Seller/Client format
+_EXAMPLE1_INPUT = (
+    "Invoice no: 84652373 Date of issue: 02/23/2021 Seller: Client: "
+    "Nguyen-Roach Clark-Foster 247 David Highway Lake John, WV 84178 "
+    "SUMMARY Net worth VAT Gross worth 211,77 21,18 232,95 Total $ 232,95"
+)
+_EXAMPLE1_OUTPUT = (
+    '{"invoice_number": "84652373", "invoice_date": "2021-02-23", '
+    '"due_date": null, "supplier_name": "Nguyen-Roach", '
+    '"supplier_address": "247 David Highway, Lake John, WV 84178", '
+    '"customer_name": "Clark-Foster", "subtotal": 211.77, '
+    '"tax_amount": 21.18, "total_amount": 232.95, "currency": "USD"}'
+)
+
+# Example 2: Standard format
+_EXAMPLE2_INPUT = (
+    "INVOICE #INV-12345 Date: January 15, 2024 Bill To: ABC Corp "
+    "From: XYZ Suppliers Subtotal: $1,000.00 Tax: $100.00 Total: $1,100.00"
+)
+_EXAMPLE2_OUTPUT = (
+    '{"invoice_number": "INV-12345", "invoice_date": "2024-01-15", '
+    '"due_date": null, "supplier_name": "XYZ Suppliers", '
+    '"supplier_address": null, "customer_name": "ABC Corp", '
+    '"subtotal": 1000.00, "tax_amount": 100.00, '
+    '"total_amount": 1100.00, "currency": "USD"}'
+)
+
+# Everything but the OCR text is fixed, so the prompt is assembled once at import
+_EXTRACTION_PROMPT_HEAD = f"""You are an invoice data extraction assistant. \
+Extract invoice information from OCR text and return ONLY valid JSON.
+
+SCHEMA (use null for missing fields):
+{_SCHEMA}
+
+EXAMPLES:
+
+Input: "{_EXAMPLE1_INPUT}"
+Output: {_EXAMPLE1_OUTPUT}
+
+Input: "{_EXAMPLE2_INPUT}"
+Output: {_EXAMPLE2_OUTPUT}
+
+INSTRUCTIONS:
+- "Seller:" = supplier, "Client:" or "Bill To:" = customer
+- Convert dates: MM/DD/YYYY -> YYYY-MM-DD
+- Convert European decimals: 211,77 -> 211.77
+- "Net worth" = subtotal, "Gross worth"/"Total" = total_amount
+- Format address: "street, city, state zip"
+- Return ONLY JSON, no explanation
+
+INPUT:
+"""
+_EXTRACTION_PROMPT_TAIL = """
+
+OUTPUT:"""
+
+
+class _ObjectEndScanner:
+    """Finds where the first top-level JSON object ends in text fed piece by piece."""
+
+    def __init__(self) -> None:
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> bool:
+        """Scan the next piece of text.
+
+        Args:
+            text: Text following everything fed so far
+
+        Returns:
+            True once the first top-level object has been closed
+        """
+        for char in text:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self._depth:
+                self._in_string = True  # Quotes in prose before the object are ignored
+            elif char == "{":
+                self._depth += 1
+            elif char == "}" and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    return True
+        return False
+
 
 class OllamaExtractionProvider(ExtractionProvider):
     """Ollama-based extraction provider for self-hosted LLM inference.
@@ -34,16 +172,39 @@ class OllamaExtractionProvider(ExtractionProvider):
     Supports models like Qwen2.5, Llama3, Mistral.
     """
 
-    def __init__(self, settings: Settings) -> None:
+    settings_fields = (
+        "ollama_base_url",
+        "ollama_model",
+        "ollama_availability_ttl",
+        "ollama_cache_size",
+        "ollama_stream",
+    )
+
+    def __init__(self, settings: Settings, transport: httpx.BaseTransport | None = None) -> None:
         """Initialize Ollama extraction provider.
 
         Args:
             settings: Application settings
+            transport: Optional httpx transport (e.g. httpx.MockTransport in tests)
         """
         super().__init__(settings)
         self._base_url = settings.ollama_base_url
         self._model = settings.ollama_model
-        self._client = httpx.Client(timeout=120.0)  # LLMs can be slow
+        # One pooled client for all requests, so calls reuse keep-alive connections
+        self._client = httpx.Client(
+            base_url=self._base_url,
+            timeout=120.0,  # LLMs can be slow
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+            transport=transport,
+        )
+        self._stream = settings.ollama_stream
+        self._availability_ttl = settings.ollama_availability_ttl
+        # (monotonic timestamp, result) of the last server check
+        self._availability: tuple[float, bool] | None = None
+        # Successful results by prompt digest, least recently used first
+        self._result_cache: OrderedDict[str, ExtractionResult] = OrderedDict()
+        self._result_cache_size = settings.ollama_cache_size
+        self._result_cache_lock = threading.Lock()
 
     @property
     def provider_name(self) -> str:
@@ -54,14 +215,52 @@ class OllamaExtractionProvider(ExtractionProvider):
         """
         return "ollama"
 
+    def close(self) -> None:
+        """Close the HTTP client and its pooled connections."""
+        self._client.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
     def is_available(self) -> bool:
         """Check if Ollama server is running and model is available.
 
+        The result is reused for ollama_availability_ttl seconds, so frequent
+        callers (health checks, routing) do not query the server every time.
+
+        Returns:
+            True if Ollama server responds and model is loaded
+        """
+        now = time.monotonic()
+        if self._availability is not None:
+            checked_at, available = self._availability
+            if now - checked_at < self._availability_ttl:
+                return available
+
+        available = self._check_server()
+        self._availability = (now, available)
+        return available
+
+    def clear_availability_cache(self) -> None:
+        """Forget the cached availability result so the next check hits the server."""
+        self._availability = None
+
+    def _check_server(self) -> bool:
+        """Query the Ollama server for the configured model.
+
         Returns:
             True if Ollama server responds and model is loaded
         """
         try:
-            response = self._client.get(f"{self._base_url}/api/tags")
+            response = self._client.get("/api/tags")
             if response.status_code != 200:
                 return False
             # Check if configured model is available
@@ -74,6 +273,10 @@ class OllamaExtractionProvider(ExtractionProvider):
     def extract_invoice_fields(self, ocr_text: str) -> ExtractionResult:
         """Extract structured invoice data from OCR text using Ollama.
 
+        Successful results are cached in memory by model and prompt, so
+        re-processing the same document does not run inference again. Each
+        caller receives its own copy of a cached result.
+
         Args:
             ocr_text: Raw text from OCR engine
 
@@ -88,10 +291,15 @@ class OllamaExtractionProvider(ExtractionProvider):
                 provider=self.provider_name,
             )
 
-        try:
-            # Build prompt
-            prompt = self._build_extraction_prompt(ocr_text)
+        # Build prompt
+        prompt = self._build_extraction_prompt(ocr_text)
 
+        cache_key = self._result_cache_key(prompt)
+        cached = self._get_cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
             # Call Ollama with retry logic
             response_text = self._call_ollama_with_retry(prompt)
 
@@ -101,11 +309,13 @@ class OllamaExtractionProvider(ExtractionProvider):
             # Convert to Pydantic model
             invoice_data = InvoiceData(**invoice_dict)
 
-            return ExtractionResult(
+            result = ExtractionResult(
                 invoice_data=invoice_data,
                 success=True,
                 provider=self.provider_name,
             )
+            self._cache_result(cache_key, result)
+            return result
 
         except json.JSONDecodeError as e:
             logger.warning(f"Failed to parse JSON from Ollama response: {e}")
@@ -124,6 +334,52 @@ class OllamaExtractionProvider(ExtractionProvider):
                 provider=self.provider_name,
             )
 
+    def _result_cache_key(self, prompt: str) -> str:
+        """Digest identifying an extraction by model and full prompt.
+
+        The prompt embeds the template, so template changes never hit stale
+        entries; hashing keeps multi-kilobyte prompts out of the cache.
+
+        Args:
+            prompt: Extraction prompt for the LLM
+
+        Returns:
+            Hex BLAKE2b-256 digest
+        """
+        return hashlib.blake2b(f"{self._model}\0{prompt}".encode(), digest_size=32).hexdigest()
+
+    def _get_cached_result(self, key: str) -> ExtractionResult | None:
+        """Look up a cached extraction result, marking it recently used.
+
+        Args:
+            key: Digest from _result_cache_key
+
+        Returns:
+            Copy of the cached result, or None on a miss
+        """
+        with self._result_cache_lock:
+            result = self._result_cache.get(key)
+            if result is None:
+                return None
+            self._result_cache.move_to_end(key)
+        return result.model_copy(deep=True)
+
+    def _cache_result(self, key: str, result: ExtractionResult) -> None:
+        """Store a copy of an extraction result, evicting the least recently used one if full.
+
+        Args:
+            key: Digest from _result_cache_key
+            result: Successful extraction result
+        """
+        if self._result_cache_size == 0:
+            return
+        stored = result.model_copy(deep=True)
+        with self._result_cache_lock:
+            self._result_cache[key] = stored
+            self._result_cache.move_to_end(key)
+            if len(self._result_cache) > self._result_cache_size:
+                self._result_cache.popitem(last=False)
+
     @retry(
         retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
         wait=wait_exponential_jitter(initial=1, max=30),
@@ -142,26 +398,57 @@ class OllamaExtractionProvider(ExtractionProvider):
         Raises:
             httpx.HTTPError: After all retry attempts exhausted
         """
-        response = self._client.post(
-            f"{self._base_url}/api/generate",
-            json={
-                "model": self._model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0,  # Deterministic output
-                    "num_predict": 1024,  # Max tokens
-                },
+        body = {
+            "model": self._model,
+            "prompt": prompt,
+            "format": _OUTPUT_FORMAT,
+            "stream": self._stream,
+            "options": {
+                "temperature": 0,  # Deterministic output
+                "num_predict": 1024,  # Max tokens
             },
-        )
+        }
+        if self._stream:
+            return self._read_stream(body)
+
+        response = self._client.post("/api/generate", json=body)
         response.raise_for_status()
         result: str = response.json().get("response", "")
         return result
 
+    def _read_stream(self, body: dict[str, Any]) -> str:
+        """Collect streamed output until the JSON object is complete.
+
+        Ollama streams one JSON line per generated chunk. Reading stops as soon
+        as the first object closes; leaving the stream early drops the
+        connection, which makes the server stop generating trailing text.
+
+        Args:
+            body: Request body for /api/generate with streaming enabled
+
+        Returns:
+            Response text generated up to the end of the object
+        """
+        parts: list[str] = []
+        scanner = _ObjectEndScanner()
+        with self._client.stream("POST", "/api/generate", json=body) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                piece: str = chunk.get("response", "")
+                parts.append(piece)
+                if chunk.get("done") or scanner.feed(piece):
+                    break
+        return "".join(parts)
+
     def _parse_json_response(self, response_text: str) -> dict[str, Any]:
         """Extract and parse JSON from LLM response.
 
-        Handles common LLM quirks like markdown code blocks.
+        Requests set a structured output format, so the response is normally
+        bare JSON; markdown code blocks and surrounding prose are still handled
+        for servers that ignore the format.
 
         Args:
             response_text: Raw LLM response
@@ -172,20 +459,25 @@ class OllamaExtractionProvider(ExtractionProvider):
         Raises:
             json.JSONDecodeError: If no valid JSON found
         """
-        # Try to extract JSON from markdown code block
-        json_match = re.search(r"```(?:json)?\s*([\s\S]*?)```", response_text)
-        if json_match:
-            result: dict[str, Any] = json.loads(json_match.group(1).strip())
+        # Usual case: the model followed instructions and returned bare JSON
+        stripped = response_text.strip()
+        if stripped.startswith("{") and stripped.endswith("}"):
+            try:
+                result: dict[str, Any] = _json_loads(stripped)
+                return result
+            except json.JSONDecodeError:
+                pass  # e.g. two objects, or prose between braces
+
+        # The first "{" starts the object whether it sits in a markdown code
+        # block or is wrapped in prose; raw_decode parses it in one pass
+        # (tracking strings and nesting) and ignores whatever follows.
+        start = response_text.find("{")
+        if start == -1:
+            # No object at all: parse the entire response
+            result = _json_loads(stripped)
             return result
 
-        # Try to find JSON object directly
-        json_match = re.search(r"\{[\s\S]*\}", response_text)
-        if json_match:
-            result = json.loads(json_match.group(0))
-            return result
-
-        # Try parsing entire response
-        result = json.loads(response_text.strip())
+        result, _ = _JSON_DECODER.raw_decode(response_text, start)
         return result
 
     def _build_extraction_prompt(self, ocr_text: str) -> str:
@@ -197,65 +489,4 @@ class OllamaExtractionProvider(ExtractionProvider):
         Returns:
             Formatted prompt string
         """
-        # Schema definition for JSON output
-        schema = (
-            '{"invoice_number": string|null, "invoice_date": string|null (YYYY-MM-DD), '
-            '"due_date": string|null, "supplier_name": string|null, '
-            '"supplier_address": string|null, "customer_name": string|null, '
-            '"subtotal": number|null, "tax_amount": number|null, '
-            '"total_amount": number|null, "currency": string|null}'
-        )
-
-        # Example 1: Seller/Client format
-        example1_input = (
-            "Invoice no: 84652373 Date of issue: 02/23/2021 Seller: Client: "
-            "Nguyen-Roach Clark-Foster 247 David Highway Lake John, WV 84178 "
-            "SUMMARY Net worth VAT Gross worth 211,77 21,18 232,95 Total $ 232,95"
-        )
-        example1_output = (
-            '{"invoice_number": "84652373", "invoice_date": "2021-02-23", '
-            '"due_date": null, "supplier_name": "Nguyen-Roach", '
-            '"supplier_address": "247 David Highway, Lake John, WV 84178", '
-            '"customer_name": "Clark-Foster", "subtotal": 211.77, '
-            '"tax_amount": 21.18, "total_amount": 232.95, "currency": "USD"}'
-        )
-
-        # Example 2: Standard format
-        example2_input = (
-            "INVOICE #INV-12345 Date: January 15, 2024 Bill To: ABC Corp "
-            "From: XYZ Suppliers Subtotal: $1,000.00 Tax: $100.00 Total: $1,100.00"
-        )
-        example2_output = (
-            '{"invoice_number": "INV-12345", "invoice_date": "2024-01-15", '
-            '"due_date": null, "supplier_name": "XYZ Suppliers", '
-            '"supplier_address": null, "customer_name": "ABC Corp", '
-            '"subtotal": 1000.00, "tax_amount": 100.00, '
-            '"total_amount": 1100.00, "currency": "USD"}'
-        )
-
-        return f"""You are an invoice data extraction assistant. \
-Extract invoice information from OCR text and return ONLY valid JSON.
-
-SCHEMA (use null for missing fields):
-{schema}
-
-EXAMPLES:
-
-Input: "{example1_input}"
-Output: {example1_output}
-
-Input: "{example2_input}"
-Output: {example2_output}
-
-INSTRUCTIONS:
-- "Seller:" = supplier, "Client:" or "Bill To:" = customer
-- Convert dates: MM/DD/YYYY -> YYYY-MM-DD
-- Convert European decimals: 211,77 -> 211.77
-- "Net worth" = subtotal, "Gross worth"/"Total" = total_amount
-- Format address: "street, city, state zip"
-- Return ONLY JSON, no explanation
-
-INPUT:
-{ocr_text}
-
-OUTPUT:"""
+        return _EXTRACTION_PROMPT_HEAD + ocr_text + _EXTRACTION_PROMPT_TAIL
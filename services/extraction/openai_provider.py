@@ -3,17 +3,28 @@
 Uses OpenAI API for structured data extraction from OCR text.
 Based on OpenAI function calling / structured outputs pattern.
 
-Includes retry logic with exponential backoff for transient API errors.
+Includes retry logic with exponential backoff for transient API errors, and an
+async batch entry point that overlaps API calls with bounded concurrency.
 
 This provider uses cloud-based OpenAI API. For self-hosted/local inference,
 use LocalExtractionProvider instead.
 """
 
+import asyncio
 import json
 import os
+import threading
+from collections.abc import Callable
 from typing import Any
 
-from openai import OpenAI
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -25,6 +36,109 @@ from services.extraction.base import ExtractionProvider, ExtractionResult
 from services.extraction.schema import InvoiceData
 from services.shared.config import Settings
 
+# orjson is optional: it parses function_call arguments faster than stdlib json
+_json_loads: Callable[[str], Any]
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    _json_loads = json.loads
+
+# Errors worth retrying; anything else (auth, bad request, ...) fails immediately
+_TRANSIENT_OPENAI_ERRORS: tuple[type[Exception], ...] = (
+    APIConnectionError,
+    APITimeoutError,
+    RateLimitError,
+    InternalServerError,
+)
+
+# Static request parts, built once at import instead of on every extraction call.
+_SYSTEM_MESSAGE: dict[str, str] = {
+    "role": "system",
+    "content": "You are an invoice data extraction assistant.",
+}
+
+# OpenAI function calling schema for InvoiceData
+_INVOICE_FUNCTION: dict[str, Any] = {
+    "name": "extract_invoice_data",
+    "description": "Extract structured invoice data from OCR text",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "invoice_number": {"type": ["string", "null"]},
+            "invoice_date": {"type": ["string", "null"], "format": "date"},
+            "due_date": {"type": ["string", "null"], "format": "date"},
+            "supplier_name": {"type": ["string", "null"]},
+            "supplier_address": {"type": ["string", "null"]},
+            "customer_name": {"type": ["string", "null"]},
+            "subtotal": {"type": ["number", "null"]},
+            "tax_amount": {"type": ["number", "null"]},
+            "total_amount": {"type": ["number", "null"]},
+            "currency": {"type": ["string", "null"]},
+            "confidence_score": {"type": ["number", "null"], "minimum": 0, "maximum": 1},
+        },
+    },
+}
+_INVOICE_FUNCTIONS: list[dict[str, Any]] = [_INVOICE_FUNCTION]
+_INVOICE_FUNCTION_CALL: dict[str, str] = {"name": _INVOICE_FUNCTION["name"]}
+
+# Few-shot extraction prompt, split around the OCR text so each call is a plain concatenation
+_EXTRACTION_PROMPT_HEAD = """Extract invoice information from OCR text and return structured data.
+
+Example 1 (Standard format):
+OCR Text: "INVOICE #INV-12345\\nDate: January 15, 2024\\nDue: February 15, 2024\\n\
+Bill To: ABC Corp\\nFrom: XYZ Suppliers Inc\\n123 Main Street\\n\
+Subtotal: $1,000.00\\nTax (10%): $100.00\\nTotal: $1,100.00"
+
+Expected Output: {"invoice_number": "INV-12345", "invoice_date": "2024-01-15", \
+"due_date": "2024-02-15", "customer_name": "ABC Corp", \
+"supplier_name": "XYZ Suppliers Inc", "supplier_address": "123 Main Street", \
+"subtotal": 1000.00, "tax_amount": 100.00, "total_amount": 1100.00, "currency": "USD"}
+
+Example 2 (Seller/Client side-by-side format):
+OCR Text: "Invoice no: 84652373 Date of issue: 02/23/2021 Seller: Client: \
+Nguyen-Roach Clark-Foster 247 David Highway 77477 Cliff Apt. 853 \
+Lake John, WV 84178 Washingtonbury, MS 78346 Tax Id: 991-72-5826 \
+SUMMARY VAT [%] Net worth VAT Gross worth 10% 211,77 21,18 232,95 Total $ 232,95"
+
+Expected Output: {"invoice_number": "84652373", "invoice_date": "2021-02-23", \
+"supplier_name": "Nguyen-Roach", "supplier_address": "247 David Highway, Lake John, WV 84178", \
+"customer_name": "Clark-Foster", \
+"subtotal": 211.77, "tax_amount": 21.18, "total_amount": 232.95, "currency": "USD"}
+
+Example 3 (European format):
+OCR Text: "Invoice Number: 2024-001\\nIssued: 03/10/2024\\n\
+Client: Tech Solutions Ltd\\nVendor: Office Supplies Co\\n\
+Amount Due: EUR 850.00\\nVAT (20%): EUR 170.00\\nGrand Total: EUR 1,020.00"
+
+Expected Output: {"invoice_number": "2024-001", "invoice_date": "2024-03-10", \
+"customer_name": "Tech Solutions Ltd", "supplier_name": "Office Supplies Co", \
+"subtotal": 850.00, "tax_amount": 170.00, "total_amount": 1020.00, "currency": "EUR"}
+
+CRITICAL Instructions for parsing:
+- When you see "Seller: Client:" the FIRST company name is the seller, SECOND is the client
+- For addresses in side-by-side format: Look for Tax Id patterns to find address boundaries
+- The seller address is between seller name and "Tax Id: XXX-XX-XXXX" (first Tax Id)
+- "Net worth" in SUMMARY = subtotal (before tax)
+- "Gross worth" or "Total" = total_amount (after tax)
+- Parse dates: "02/23/2021" -> "2021-02-23" (MM/DD/YYYY to YYYY-MM-DD)
+- European decimals: "211,77" -> 211.77 (comma is decimal separator)
+- Return null for any field not clearly present
+
+ADDRESS EXTRACTION (critical):
+- Include FULL street with Suite/Apt numbers: "33771 Powell Pike Suite 054"
+- Include city PREFIXES (East, West, North, South, Lake, New)
+- Format: "street, city, state zip" with comma between street and city
+- Example: "45558 Davis Mountains, East Zacharyville, IA 99376"
+- When OCR shows interleaved addresses, SELLER address ends at first "Tax Id:"
+
+OCR Text:
+"""
+_EXTRACTION_PROMPT_TAIL = """
+
+Extract the invoice data. For supplier_address, extract ONLY the seller's full address."""
+
 
 class OpenAIExtractionProvider(ExtractionProvider):
     """OpenAI-based extraction provider using GPT-4o-mini.
@@ -33,6 +147,8 @@ class OpenAIExtractionProvider(ExtractionProvider):
     Requires OPENAI_API_KEY environment variable.
     """
 
+    settings_fields = ("openai_model", "openai_concurrency")
+
     def __init__(self, settings: Settings) -> None:
         """Initialize OpenAI extraction provider.
 
@@ -41,6 +157,7 @@ class OpenAIExtractionProvider(ExtractionProvider):
         """
         super().__init__(settings)
         self._client: OpenAI | None = None
+        self._client_lock = threading.Lock()
 
     @property
     def provider_name(self) -> str:
@@ -68,77 +185,163 @@ class OpenAIExtractionProvider(ExtractionProvider):
         Returns:
             ExtractionResult with structured invoice data or error, provider='openai'
         """
-        # Check for API key at runtime
-        if not self.is_available():
-            return ExtractionResult(
-                invoice_data=None,
-                success=False,
-                error="OPENAI_API_KEY environment variable not set",
-                provider=self.provider_name,
-            )
-
-        if not ocr_text or not ocr_text.strip():
-            return ExtractionResult(
-                invoice_data=None,
-                success=False,
-                error="Empty OCR text provided",
-                provider=self.provider_name,
-            )
+        error_result = self._check_extraction_input(ocr_text)
+        if error_result is not None:
+            return error_result
 
         try:
-            # Initialize client if not already done
-            api_key = os.getenv("OPENAI_API_KEY")
-            if self._client is None or self._client.api_key != api_key:
-                self._client = OpenAI(api_key=api_key)
+            # Reuse client (and its connection pool) across calls
+            client = self._get_client()
 
             # Create extraction prompt
             prompt = self._build_extraction_prompt(ocr_text)
 
             # Call OpenAI with retry logic
-            response = self._call_openai_with_retry(prompt)
+            response = self._call_openai_with_retry(client, prompt)
+
+            return self._parse_response(response)
+
+        except Exception as e:
+            return self._failure(f"Extraction failed: {str(e)}")
+
+    async def extract_invoice_fields_batch(self, ocr_texts: list[str]) -> list[ExtractionResult]:
+        """Extract structured invoice data from many OCR texts concurrently.
+
+        Requests run on the async OpenAI client with at most
+        settings.openai_concurrency calls in flight, so batch wall time is
+        bounded by the slowest calls instead of the sum of all latencies.
+
+        Each batch opens and closes its own async client: its connection pool
+        is bound to the running event loop, while the provider itself is
+        cached and outlives any one loop.
+
+        Args:
+            ocr_texts: Raw texts from OCR engine
+
+        Returns:
+            One ExtractionResult per input text, in input order
+        """
+        if not self.is_available():
+            return [self._failure("OPENAI_API_KEY environment variable not set") for _ in ocr_texts]
 
-            # Parse response
-            message = response.choices[0].message
-            if message.function_call is None:
-                return ExtractionResult(
-                    invoice_data=None,
-                    success=False,
-                    error="No function call in API response",
-                    provider=self.provider_name,
-                )
+        semaphore = asyncio.Semaphore(self.settings.openai_concurrency)
 
-            invoice_dict = json.loads(message.function_call.arguments)
+        async with AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY")) as client:
 
-            # Convert to Pydantic model
-            invoice_data = InvoiceData(**invoice_dict)
+            async def bounded(ocr_text: str) -> ExtractionResult:
+                async with semaphore:
+                    return await self._extract_invoice_fields_async(client, ocr_text)
 
-            return ExtractionResult(
-                invoice_data=invoice_data,
-                success=True,
-                provider=self.provider_name,
-            )
+            return list(await asyncio.gather(*(bounded(text) for text in ocr_texts)))
+
+    async def _extract_invoice_fields_async(
+        self, client: AsyncOpenAI, ocr_text: str
+    ) -> ExtractionResult:
+        """Async counterpart of extract_invoice_fields for batch extraction.
+
+        Args:
+            client: Async OpenAI client of the current batch
+            ocr_text: Raw text from OCR engine
+
+        Returns:
+            ExtractionResult with structured invoice data or error, provider='openai'
+        """
+        error_result = self._check_extraction_input(ocr_text)
+        if error_result is not None:
+            return error_result
+
+        try:
+            prompt = self._build_extraction_prompt(ocr_text)
+            response = await self._call_openai_with_retry_async(client, prompt)
+            return self._parse_response(response)
 
         except Exception as e:
-            return ExtractionResult(
-                invoice_data=None,
-                success=False,
-                error=f"Extraction failed: {str(e)}",
-                provider=self.provider_name,
-            )
+            return self._failure(f"Extraction failed: {str(e)}")
+
+    def _check_extraction_input(self, ocr_text: str) -> ExtractionResult | None:
+        """Validate runtime prerequisites and input before calling the API.
+
+        Args:
+            ocr_text: Raw text from OCR engine
+
+        Returns:
+            Failed ExtractionResult if extraction cannot proceed, otherwise None
+        """
+        # Check for API key at runtime
+        if not self.is_available():
+            return self._failure("OPENAI_API_KEY environment variable not set")
+
+        if not ocr_text or not ocr_text.strip():
+            return self._failure("Empty OCR text provided")
+
+        return None
+
+    def _parse_response(self, response: Any) -> ExtractionResult:
+        """Convert an OpenAI chat completion into an ExtractionResult.
+
+        Args:
+            response: OpenAI API response
+
+        Returns:
+            ExtractionResult with parsed invoice data or error
+        """
+        message = response.choices[0].message
+        if message.function_call is None:
+            return self._failure("No function call in API response")
+
+        # Parse arguments and validate into the Pydantic model
+        invoice_data = InvoiceData.model_validate(_json_loads(message.function_call.arguments))
+
+        return ExtractionResult(
+            invoice_data=invoice_data,
+            success=True,
+            provider=self.provider_name,
+        )
+
+    def _failure(self, error: str) -> ExtractionResult:
+        """Build a failed ExtractionResult for this provider."""
+        return ExtractionResult(
+            invoice_data=None,
+            success=False,
+            error=error,
+            provider=self.provider_name,
+        )
+
+    def _get_client(self) -> OpenAI:
+        """Get or create the OpenAI client (thread-safe lazy initialization).
+
+        The client is rebuilt only when OPENAI_API_KEY changes, so repeated
+        extractions share one HTTP connection pool.
+
+        Returns:
+            OpenAI client for the current API key
+        """
+        api_key = os.getenv("OPENAI_API_KEY")
+        client = self._client
+        if client is None or client.api_key != api_key:
+            with self._client_lock:
+                client = self._client
+                if client is None or client.api_key != api_key:
+                    client = OpenAI(api_key=api_key)
+                    self._client = client
+        return client
 
     @retry(
-        retry=retry_if_exception_type((Exception,)),  # Retry on transient errors
+        retry=retry_if_exception_type(_TRANSIENT_OPENAI_ERRORS),  # Retry on transient errors
         wait=wait_exponential_jitter(initial=1, max=60),  # Exponential backoff with jitter
         stop=stop_after_attempt(3),  # Max 3 attempts
         reraise=True,  # Re-raise exception after max attempts
     )
-    def _call_openai_with_retry(self, prompt: str) -> Any:
+    def _call_openai_with_retry(self, client: OpenAI, prompt: str) -> Any:
         """Call OpenAI API with retry logic for transient errors.
 
         Uses exponential backoff with jitter to handle rate limits and temporary failures.
         Retries up to 3 times with increasing delays (1s, 2-4s, 4-8s, up to 60s max).
+        Only connection errors, timeouts, rate limits and server errors are retried;
+        permanent errors such as authentication failures are raised on the first attempt.
 
         Args:
+            client: OpenAI client from _get_client
             prompt: Extraction prompt for the LLM
 
         Returns:
@@ -147,9 +350,6 @@ class OpenAIExtractionProvider(ExtractionProvider):
         Raises:
             Exception: After all retry attempts are exhausted
         """
-        if self._client is None:
-            raise RuntimeError("OpenAI client not initialized")
-
         # Call OpenAI with function calling for structured output
         # NOTE: Using function_call (legacy) instead of tools API because:
         # 1. function_call still fully supported by OpenAI (no deprecation deadline)
@@ -157,109 +357,56 @@ class OpenAIExtractionProvider(ExtractionProvider):
         # 3. tools API is more complex, offers no benefit for our current needs
         # 4. Migrate to tools when: (a) need multiple tools, (b) need built-in tools,
         #    or (c) OpenAI announces deprecation timeline
-        return self._client.chat.completions.create(  # type: ignore[call-overload]
-            model=self.settings.openai_model,  # Configurable: gpt-4o-mini or gpt-4o
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an invoice data extraction assistant.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            functions=[self._get_invoice_schema()],
-            function_call={"name": "extract_invoice_data"},
-            temperature=0,  # Deterministic output
-        )
-
-    def _build_extraction_prompt(self, ocr_text: str) -> str:
-        """Build prompt for LLM extraction with few-shot examples.
+        return client.chat.completions.create(**self._build_request(prompt))
 
-        Uses few-shot learning to improve extraction accuracy by providing
-        examples of invoice OCR text and expected structured output.
+    @retry(
+        retry=retry_if_exception_type(_TRANSIENT_OPENAI_ERRORS),
+        wait=wait_exponential_jitter(initial=1, max=60),
+        stop=stop_after_attempt(3),
+        reraise=True,
+    )
+    async def _call_openai_with_retry_async(self, client: AsyncOpenAI, prompt: str) -> Any:
+        """Async variant of _call_openai_with_retry (same retry policy).
 
         Args:
-            ocr_text: Raw OCR text
+            client: Async OpenAI client of the current batch
+            prompt: Extraction prompt for the LLM
 
         Returns:
-            Formatted prompt string with examples
-        """
-        return f"""Extract invoice information from OCR text and return structured data.
-
-Example 1 (Standard format):
-OCR Text: "INVOICE #INV-12345\\nDate: January 15, 2024\\nDue: February 15, 2024\\n\
-Bill To: ABC Corp\\nFrom: XYZ Suppliers Inc\\n123 Main Street\\n\
-Subtotal: $1,000.00\\nTax (10%): $100.00\\nTotal: $1,100.00"
-
-Expected Output: {{"invoice_number": "INV-12345", "invoice_date": "2024-01-15", \
-"due_date": "2024-02-15", "customer_name": "ABC Corp", \
-"supplier_name": "XYZ Suppliers Inc", "supplier_address": "123 Main Street", \
-"subtotal": 1000.00, "tax_amount": 100.00, "total_amount": 1100.00, "currency": "USD"}}
-
-Example 2 (Seller/Client side-by-side format):
-OCR Text: "Invoice no: 84652373 Date of issue: 02/23/2021 Seller: Client: \
-Nguyen-Roach Clark-Foster 247 David Highway 77477 Cliff Apt. 853 \
-Lake John, WV 84178 Washingtonbury, MS 78346 Tax Id: 991-72-5826 \
-SUMMARY VAT [%] Net worth VAT Gross worth 10% 211,77 21,18 232,95 Total $ 232,95"
-
-Expected Output: {{"invoice_number": "84652373", "invoice_date": "2021-02-23", \
-"supplier_name": "Nguyen-Roach", "supplier_address": "247 David Highway, Lake John, WV 84178", \
-"customer_name": "Clark-Foster", \
-"subtotal": 211.77, "tax_amount": 21.18, "total_amount": 232.95, "currency": "USD"}}
+            OpenAI API response
 
-Example 3 (European format):
-OCR Text: "Invoice Number: 2024-001\\nIssued: 03/10/2024\\n\
-Client: Tech Solutions Ltd\\nVendor: Office Supplies Co\\n\
-Amount Due: EUR 850.00\\nVAT (20%): EUR 170.00\\nGrand Total: EUR 1,020.00"
+        Raises:
+            Exception: After all retry attempts are exhausted
+        """
+        return await client.chat.completions.create(**self._build_request(prompt))
 
-Expected Output: {{"invoice_number": "2024-001", "invoice_date": "2024-03-10", \
-"customer_name": "Tech Solutions Ltd", "supplier_name": "Office Supplies Co", \
-"subtotal": 850.00, "tax_amount": 170.00, "total_amount": 1020.00, "currency": "EUR"}}
+    def _build_request(self, prompt: str) -> dict[str, Any]:
+        """Build chat completion arguments for an extraction prompt.
 
-CRITICAL Instructions for parsing:
-- When you see "Seller: Client:" the FIRST company name is the seller, SECOND is the client
-- For addresses in side-by-side format: Look for Tax Id patterns to find address boundaries
-- The seller address is between seller name and "Tax Id: XXX-XX-XXXX" (first Tax Id)
-- "Net worth" in SUMMARY = subtotal (before tax)
-- "Gross worth" or "Total" = total_amount (after tax)
-- Parse dates: "02/23/2021" -> "2021-02-23" (MM/DD/YYYY to YYYY-MM-DD)
-- European decimals: "211,77" -> 211.77 (comma is decimal separator)
-- Return null for any field not clearly present
+        Args:
+            prompt: Extraction prompt for the LLM
 
-ADDRESS EXTRACTION (critical):
-- Include FULL street with Suite/Apt numbers: "33771 Powell Pike Suite 054"
-- Include city PREFIXES (East, West, North, South, Lake, New)
-- Format: "street, city, state zip" with comma between street and city
-- Example: "45558 Davis Mountains, East Zacharyville, IA 99376"
-- When OCR shows interleaved addresses, SELLER address ends at first "Tax Id:"
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        return {
+            "model": self.settings.openai_model,  # Configurable: gpt-4o-mini or gpt-4o
+            "messages": [_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+            "functions": _INVOICE_FUNCTIONS,
+            "function_call": _INVOICE_FUNCTION_CALL,
+            "temperature": 0,  # Deterministic output
+        }
 
-OCR Text:
-{ocr_text}
+    def _build_extraction_prompt(self, ocr_text: str) -> str:
+        """Build prompt for LLM extraction with few-shot examples.
 
-Extract the invoice data. For supplier_address, extract ONLY the seller's full address."""
+        Uses few-shot learning to improve extraction accuracy by providing
+        examples of invoice OCR text and expected structured output.
 
-    def _get_invoice_schema(self) -> dict[str, Any]:
-        """Get OpenAI function calling schema for InvoiceData.
+        Args:
+            ocr_text: Raw OCR text
 
         Returns:
-            Function definition dict for OpenAI API
+            Formatted prompt string with examples
         """
-        return {
-            "name": "extract_invoice_data",
-            "description": "Extract structured invoice data from OCR text",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "invoice_number": {"type": ["string", "null"]},
-                    "invoice_date": {"type": ["string", "null"], "format": "date"},
-                    "due_date": {"type": ["string", "null"], "format": "date"},
-                    "supplier_name": {"type": ["string", "null"]},
-                    "supplier_address": {"type": ["string", "null"]},
-                    "customer_name": {"type": ["string", "null"]},
-                    "subtotal": {"type": ["number", "null"]},
-                    "tax_amount": {"type": ["number", "null"]},
-                    "total_amount": {"type": ["number", "null"]},
-                    "currency": {"type": ["string", "null"]},
-                    "confidence_score": {"type": ["number", "null"], "minimum": 0, "maximum": 1},
-                },
-            },
-        }
+        return _EXTRACTION_PROMPT_HEAD + ocr_text + _EXTRACTION_PROMPT_TAIL
@@ -3,8 +3,11 @@
 Based on industry-standard invoice schemas and best practices.
 """
 
+import threading
+from collections import OrderedDict
 from datetime import date
 from decimal import Decimal
+from typing import Any, ClassVar
 
 from pydantic import BaseModel, Field
 
@@ -36,3 +39,39 @@ class InvoiceData(BaseModel):
     confidence_score: float | None = Field(
         None, description="Overall extraction confidence (0-1)", ge=0, le=1
     )
+
+    # Validated instances by field values; intern() hands out copies of them
+    _interned: ClassVar[OrderedDict[tuple[tuple[str, type, str], ...], "InvoiceData"]] = (
+        OrderedDict()
+    )
+    _interned_lock: ClassVar[threading.Lock] = threading.Lock()
+    _interned_max_size: ClassVar[int] = 1024
+
+    @classmethod
+    def intern(cls, **fields: Any) -> "InvoiceData":
+        """Get an instance for the given field values without re-validating them.
+
+        Field values are validated once; repeated calls with the same values
+        return a shallow copy of the cached instance. Values are matched by
+        type and repr, so Decimal("100") and Decimal("100.00"), or True and 1,
+        are kept apart. Each caller gets its own copy and may modify it.
+
+        Args:
+            **fields: Field values, as for the InvoiceData constructor
+
+        Returns:
+            InvoiceData instance owned by the caller
+        """
+        key = tuple(sorted((name, type(value), repr(value)) for name, value in fields.items()))
+        with cls._interned_lock:
+            instance = cls._interned.get(key)
+            if instance is not None:
+                cls._interned.move_to_end(key)
+        if instance is None:
+            instance = cls(**fields)
+            with cls._interned_lock:
+                cls._interned[key] = instance
+                if len(cls._interned) > cls._interned_max_size:
+                    cls._interned.popitem(last=False)
+        # All fields are immutable scalars, so a shallow copy is fully independent
+        return instance.model_copy()
@@ -7,23 +7,64 @@ Based on arq documentation:
 https://arq-docs.helpmanual.io/
 """
 
-import json
+import asyncio
+import hashlib
 import logging
 import tempfile
+from collections import OrderedDict
 from datetime import UTC, datetime
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Any
 
 from pydantic import BaseModel
 
 from services.extraction.factory import create_extraction_service
-from services.ocr.service import OCRService
+from services.ocr.service import OCRResult, OCRService
 from services.shared.config import Settings, get_settings
-from services.storage.service import StorageService
+from services.storage.service import StorageResult, StorageService
 
 logger = logging.getLogger(__name__)
 
 
+def _utc_now_iso() -> str:
+    """Current UTC time as a fixed-width ISO 8601 string (second precision)."""
+    return datetime.now(UTC).isoformat(timespec="seconds")
+
+
+class _OCRResultCache:
+    """LRU cache of successful OCR results keyed by a digest of the file content.
+
+    Re-submitted documents skip OCR. Only touched from the worker's event
+    loop, so no locking is needed.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._results: OrderedDict[bytes, OCRResult] = OrderedDict()
+        self._max_size = max_size
+
+    @staticmethod
+    def key(file_content: bytes) -> bytes:
+        """BLAKE2b-256 digest of the file content (faster than SHA-256)."""
+        return hashlib.blake2b(file_content, digest_size=32).digest()
+
+    def get(self, key: bytes) -> OCRResult | None:
+        """Look up a cached OCR result, marking it recently used."""
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+        return result
+
+    def put(self, key: bytes, result: OCRResult) -> None:
+        """Store an OCR result, evicting the least recently used one if full."""
+        if self._max_size == 0:
+            return
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > self._max_size:
+            self._results.popitem(last=False)
+
+
 class JobResult(BaseModel):
     """Result of a background job.
 
@@ -86,13 +127,14 @@ async def process_document(
     ocr_service: OCRService = ctx.get("ocr_service", OCRService(settings))
     extraction_service = ctx.get("extraction_service", create_extraction_service(settings))
     storage_service: StorageService = ctx.get("storage_service", StorageService(settings))
+    ocr_cache: _OCRResultCache = ctx.get("ocr_cache", _OCRResultCache(0))
     redis = ctx["redis"]
 
     result = JobResult(
         job_id=job_id,
         status="processing",
         document_id=document_id,
-        created_at=datetime.now(UTC).isoformat(),
+        created_at=_utc_now_iso(),
     )
 
     # Update status in Redis
@@ -106,42 +148,71 @@ async def process_document(
             tmp_path = Path(tmp.name)
 
         try:
-            # Run OCR
-            logger.info(f"Running OCR for job {job_id}")
-            ocr_result = ocr_service.extract_text(tmp_path)
+            # Identical uploads reuse the worker's cached OCR result
+            cache_key = _OCRResultCache.key(file_content)
+            ocr_result = ocr_cache.get(cache_key)
+            if ocr_result is None:
+                # Run OCR
+                logger.info(f"Running OCR for job {job_id}")
+                # OCR and extraction block, so they run in threads to keep the worker's
+                # event loop free for other jobs
+                ocr_result = await asyncio.to_thread(ocr_service.extract_text, tmp_path)
+                if ocr_result.success:
+                    ocr_cache.put(cache_key, ocr_result)
+            else:
+                logger.info(f"Reusing OCR result for identical content in job {job_id}")
 
             if not ocr_result.success:
                 result.status = "failed"
                 result.error = f"OCR failed: {ocr_result.error}"
-                result.completed_at = datetime.now(UTC).isoformat()
+                result.completed_at = _utc_now_iso()
                 await redis.set(f"job:{job_id}", result.model_dump_json(), ex=86400)
                 return result.model_dump()
 
             result.ocr_text = ocr_result.text
 
-            # Run extraction if requested
-            if extract_fields:
-                logger.info(f"Running extraction for job {job_id}")
-                extraction_result = extraction_service.extract_invoice_fields(ocr_result.text)
-                if extraction_result.success and extraction_result.invoice_data:
-                    result.extracted_data = json.loads(
-                        extraction_result.invoice_data.model_dump_json()
-                    )
-
-            # Store in object storage if enabled
+            # Start the upload in a worker thread so it overlaps with extraction
+            upload: asyncio.Future[StorageResult] | None = None
             if storage_service.is_available():
                 logger.info(f"Storing document for job {job_id}")
                 object_name = f"{document_id}/original{suffix}"
-                storage_result = storage_service.upload_bytes(
-                    data=file_content,
-                    object_name=object_name,
-                    content_type=content_type,
+                upload = asyncio.get_running_loop().run_in_executor(
+                    None,
+                    partial(
+                        storage_service.upload_bytes,
+                        data=file_content,
+                        object_name=object_name,
+                        content_type=content_type,
+                    ),
                 )
+
+            try:
+                # Run extraction if requested
+                if extract_fields:
+                    logger.info(f"Running extraction for job {job_id}")
+                    extraction_result = await asyncio.to_thread(
+                        extraction_service.extract_invoice_fields, ocr_result.text
+                    )
+                    if extraction_result.success and extraction_result.invoice_data:
+                        # JSON-compatible dict directly, without a dump/parse round-trip
+                        result.extracted_data = extraction_result.invoice_data.model_dump(
+                            mode="json"
+                        )
+            except BaseException:
+                # The job fails (or is cancelled): do not leave the upload running
+                # unobserved or the document stored for a failed job
+                if upload is not None:
+                    await _discard_upload(upload, storage_service, object_name)
+                raise
+
+            # Record where the document was stored once the upload finishes
+            if upload is not None:
+                storage_result = await upload
                 if storage_result.success:
                     result.storage_path = f"{storage_result.bucket}/{object_name}"
 
             result.status = "completed"
-            result.completed_at = datetime.now(UTC).isoformat()
+            result.completed_at = _utc_now_iso()
 
         finally:
             # Clean up temp file
@@ -152,7 +223,7 @@ async def process_document(
         logger.exception(f"Job {job_id} failed with error: {e}")
         result.status = "failed"
         result.error = str(e)
-        result.completed_at = datetime.now(UTC).isoformat()
+        result.completed_at = _utc_now_iso()
 
     # Store final result
     await redis.set(f"job:{job_id}", result.model_dump_json(), ex=86400)
@@ -161,6 +232,30 @@ async def process_document(
     return result.model_dump()
 
 
+async def _discard_upload(
+    upload: asyncio.Future[StorageResult],
+    storage_service: StorageService,
+    object_name: str,
+) -> None:
+    """Wait for an upload of a failed job to finish, then delete what it stored.
+
+    A running upload cannot be interrupted, so it is awaited rather than
+    cancelled; waiting also keeps its outcome from going unretrieved.
+
+    Args:
+        upload: Pending upload started by process_document
+        storage_service: Storage service the upload runs on
+        object_name: Object the upload writes
+    """
+    try:
+        storage_result = await upload
+    except Exception as e:
+        logger.warning(f"Upload of {object_name} failed: {e}")
+        return
+    if storage_result.success:
+        await asyncio.to_thread(storage_service.delete_object, object_name=object_name)
+
+
 async def startup(ctx: dict[str, Any]) -> None:
     """Worker startup hook - initialize services.
 
@@ -173,6 +268,7 @@ async def startup(ctx: dict[str, Any]) -> None:
     ctx["ocr_service"] = OCRService(settings)
     ctx["extraction_service"] = create_extraction_service(settings)
     ctx["storage_service"] = StorageService(settings)
+    ctx["ocr_cache"] = _OCRResultCache(settings.queue_ocr_cache_size)
     logger.info("Worker services initialized")
 
 
@@ -202,15 +298,21 @@ class WorkerSettings:
     @classmethod
     def get_redis_settings(cls) -> Any:
         """Get Redis settings from configuration."""
-        from arq.connections import RedisSettings as ArqRedisSettings
-
-        settings = get_settings()
-        # Parse redis URL
-        url = settings.redis_url
-        if url.startswith("redis://"):
-            url = url[8:]
-        host_port = url.split("/")[0]
-        host, port = host_port.split(":") if ":" in host_port else (host_port, "6379")
-        db = int(url.split("/")[1]) if "/" in url else 0
-
-        return ArqRedisSettings(host=host, port=int(port), database=db)
+        return _parse_redis_url(get_settings().redis_url)
+
+
+@lru_cache(maxsize=4)
+def _parse_redis_url(url: str) -> Any:
+    """Build arq Redis settings from a Redis URL (cached).
+
+    Credentials, rediss:// (TLS) and unix:// URLs are handled by arq.
+
+    Args:
+        url: Redis connection URL; a missing scheme means redis://
+
+    Returns:
+        arq RedisSettings for the URL
+    """
+    from arq.connections import RedisSettings as ArqRedisSettings
+
+    return ArqRedisSettings.from_dsn(url if "://" in url else f"redis://{url}")
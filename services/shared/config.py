@@ -64,6 +64,11 @@ class Settings(BaseSettings):
         default="gpt-4o-mini",
         description="OpenAI model for extraction (gpt-4o-mini=fast/cheap, gpt-4o=accurate)",
     )
+    openai_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description="Maximum concurrent OpenAI requests during batch extraction",
+    )
 
     # Ollama configuration (for extraction_provider="ollama")
     ollama_base_url: str = Field(
@@ -74,6 +79,20 @@ class Settings(BaseSettings):
         default="qwen2.5:7b",
         description="Ollama model to use for extraction (e.g., qwen2.5:7b, llama3.1:8b)",
     )
+    ollama_availability_ttl: float = Field(
+        default=30.0,
+        ge=0,
+        description="Seconds to reuse an Ollama availability check result (0 disables caching)",
+    )
+    ollama_cache_size: int = Field(
+        default=256,
+        ge=0,
+        description="Successful Ollama extractions cached in memory (0 disables caching)",
+    )
+    ollama_stream: bool = Field(
+        default=False,
+        description="Stream Ollama output and stop reading once the JSON object is complete",
+    )
 
     # Local model configuration (for extraction_provider="local")
     local_model_device: Literal["auto", "cuda", "cpu"] = Field(
@@ -132,6 +151,11 @@ class Settings(BaseSettings):
         default=300,
         description="Job timeout in seconds (default: 5 minutes)",
     )
+    queue_ocr_cache_size: int = Field(
+        default=128,
+        ge=0,
+        description="Successful OCR results cached by file content per worker (0 disables)",
+    )
 
 
 def get_settings() -> Settings:
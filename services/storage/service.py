@@ -15,7 +15,8 @@ import io
 import logging
 import mimetypes
 from datetime import timedelta
-from pathlib import Path
+from functools import lru_cache
+from pathlib import Path, PurePath
 from typing import BinaryIO
 
 from minio import Minio
@@ -33,6 +34,20 @@ from services.shared.config import Settings
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=128)
+def _content_type_for_suffixes(suffixes: str) -> str:
+    """Guess the MIME type for a file name's extensions (cached).
+
+    Args:
+        suffixes: All extensions of the file name, e.g. ".pdf" or ".tar.gz"
+
+    Returns:
+        MIME type string
+    """
+    content_type, _ = mimetypes.guess_type(f"file{suffixes}")
+    return content_type or "application/octet-stream"
+
+
 class StorageResult(BaseModel):
     """Result of storage operation.
 
@@ -171,8 +186,8 @@ class StorageService:
         Returns:
             MIME type string
         """
-        content_type, _ = mimetypes.guess_type(filename)
-        return content_type or "application/octet-stream"
+        # Keyed on the extensions only, so distinct file names share cache entries
+        return _content_type_for_suffixes("".join(PurePath(filename).suffixes))
 
     @retry(
         retry=retry_if_exception_type(S3Error),
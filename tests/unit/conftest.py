@@ -0,0 +1,15 @@
+"""Shared fixtures for unit tests."""
+
+import pytest
+
+from services.shared.config import Settings
+
+
+@pytest.fixture(scope="session")
+def default_settings() -> Settings:
+    """Default settings built once per test session.
+
+    Shared across tests, so treat as read-only; tests that need
+    non-default values construct their own Settings.
+    """
+    return Settings(_env_file=None)
@@ -4,6 +4,7 @@ Tests batch upload and status endpoints.
 """
 
 import json
+from collections.abc import Awaitable, Callable
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -12,6 +13,15 @@ from fastapi.testclient import TestClient
 from services.api.main import app
 
 
+def _mget_from(get: Callable[[str], Awaitable[str | None]]) -> AsyncMock:
+    """Build an MGET mock that answers each key like the given GET function."""
+
+    async def mget(keys: list[str]) -> list[str | None]:
+        return [await get(key) for key in keys]
+
+    return AsyncMock(side_effect=mget)
+
+
 @pytest.fixture
 def client() -> TestClient:
     """Create test client."""
@@ -222,6 +232,7 @@ class TestBatchStatusEndpoint:
             return None
 
         mock_arq_pool.pool.get = mock_get
+        mock_arq_pool.pool.mget = _mget_from(mock_get)
 
         with (
             patch("services.api.main.settings") as mock_settings,
@@ -236,6 +247,7 @@ class TestBatchStatusEndpoint:
             assert data["status"] == "processing"
             assert data["pending"] == 2
             assert data["completed"] == 0
+            mock_arq_pool.pool.mget.assert_awaited_once_with(["job:job-1", "job:job-2"])
 
     def test_batch_status_completed(self, client: TestClient, mock_arq_pool: AsyncMock) -> None:
         """Should return completed status when all jobs done."""
@@ -263,6 +275,7 @@ class TestBatchStatusEndpoint:
             return None
 
         mock_arq_pool.pool.get = mock_get
+        mock_arq_pool.pool.mget = _mget_from(mock_get)
 
         with (
             patch("services.api.main.settings") as mock_settings,
@@ -309,6 +322,7 @@ class TestBatchStatusEndpoint:
             return None
 
         mock_arq_pool.pool.get = mock_get
+        mock_arq_pool.pool.mget = _mget_from(mock_get)
 
         with (
             patch("services.api.main.settings") as mock_settings,
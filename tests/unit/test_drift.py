@@ -6,6 +6,7 @@ Tests drift detection, alerting, and metrics.
 from decimal import Decimal
 
 import pytest
+from pydantic import ValidationError
 
 from services.drift.service import DriftConfig, DriftDetector
 from services.extraction.schema import InvoiceData
@@ -119,12 +120,32 @@ class TestDriftDetector:
         )
         assert drift_detector.samples[0].overall_accuracy == 0.0
 
+    def test_add_sample_partial_match(
+        self,
+        drift_detector: DriftDetector,
+        sample_invoice: InvoiceData,
+        matching_expected: dict,
+    ) -> None:
+        """Should score accuracy as the fraction of compared fields that match."""
+        expected = {**matching_expected, "supplier_name": "Other Corp", "total_amount": None}
+
+        drift_detector.add_sample(
+            document_id="doc-1",
+            provider="test",
+            predicted=sample_invoice,
+            expected=expected,
+        )
+
+        sample = drift_detector.samples[0]
+        assert sample.field_matches == {"invoice_number": True, "supplier_name": False}
+        assert sample.overall_accuracy == 0.5
+
     def test_threshold_breach_alert(
         self, drift_detector: DriftDetector, mismatching_expected: dict
     ) -> None:
         """Should trigger alert when accuracy below threshold."""
         # Add enough samples to trigger alerting
-        bad_invoice = InvoiceData(
+        bad_invoice = InvoiceData.intern(
             invoice_number="wrong",
             total_amount=Decimal("0.00"),
             supplier_name="Wrong",
@@ -165,7 +186,7 @@ class TestDriftDetector:
             )
 
         # Now add bad samples
-        bad_invoice = InvoiceData(
+        bad_invoice = InvoiceData.intern(
             invoice_number="wrong",
             total_amount=Decimal("0.00"),
             supplier_name="Wrong",
@@ -260,6 +281,47 @@ class TestDriftDetector:
         # Should only keep last 10
         assert len(detector.samples) == 10
 
+    def test_normalize_expected_is_cached(
+        self, drift_detector: DriftDetector, matching_expected: dict
+    ) -> None:
+        """Should reuse prepared matchers for equal expected dicts."""
+        first = drift_detector.normalize_expected(matching_expected)
+        second = drift_detector.normalize_expected(dict(matching_expected))
+
+        assert first is second
+        assert set(first) == set(matching_expected)
+        assert first["supplier_name"]("  test corp ") is True
+        assert first["total_amount"](100.004) is True
+
+    def test_normalize_expected_skips_none_values(self, drift_detector: DriftDetector) -> None:
+        """Should only prepare matchers for fields with expected values."""
+        matchers = drift_detector.normalize_expected({"invoice_number": None, "tags": ["a"]})
+
+        assert set(matchers) == {"tags"}
+
+    def test_alert_history_is_bounded(
+        self, sample_invoice: InvoiceData, mismatching_expected: dict
+    ) -> None:
+        """Should keep only the most recent max_alerts alerts."""
+        config = DriftConfig(
+            min_samples=1,
+            max_alerts=3,
+            monitored_fields=["invoice_number"],
+        )
+        detector = DriftDetector(config)
+
+        for i in range(5):
+            detector.add_sample(
+                document_id=f"doc-{i}",
+                provider="test",
+                predicted=sample_invoice,
+                expected=mismatching_expected,
+            )
+
+        assert len(detector.alerts) == 3
+        assert detector.get_recent_alerts(2) == list(detector.alerts)[-2:]
+        assert detector.get_stats()["alerts_count"] == 3
+
 
 class TestDriftConfig:
     """Test DriftConfig class."""
@@ -283,3 +345,8 @@ class TestDriftConfig:
         assert config.window_size == 50
         assert config.accuracy_threshold == 0.90
         assert config.monitored_fields == ["custom_field"]
+
+    def test_rejects_negative_max_alerts(self) -> None:
+        """Should reject a negative alert history size when loading config."""
+        with pytest.raises(ValidationError):
+            DriftConfig(max_alerts=-1)
@@ -16,6 +16,7 @@ from pipeline.eval.metrics import (
     FieldMetrics,
     calculate_field_match,
     evaluate_extraction,
+    field_matcher,
 )
 from services.extraction.schema import InvoiceData
 
@@ -39,6 +40,8 @@ def test_calculate_field_match_dates() -> None:
     """Test date field matching."""
     assert calculate_field_match(date(2024, 1, 15), date(2024, 1, 15)) is True
     assert calculate_field_match(date(2024, 1, 15), date(2024, 1, 16)) is False
+    assert calculate_field_match(date(2024, 1, 15), "2024-01-15") is True
+    assert calculate_field_match("2024-01-15", date(2024, 1, 15)) is True
 
 
 def test_calculate_field_match_none() -> None:
@@ -48,6 +51,19 @@ def test_calculate_field_match_none() -> None:
     assert calculate_field_match("value", None) is False
 
 
+@pytest.mark.parametrize(
+    "expected",
+    ["  Acme Corp ", "2024-01-15", 100.0, Decimal("100.00"), date(2024, 1, 15), None],
+)
+def test_field_matcher_agrees_with_calculate_field_match(expected: object) -> None:
+    """Test specialized matchers give the same result as calculate_field_match."""
+    predictions = [None, "acme  corp", "2024-01-15", date(2024, 1, 15), 100.004, Decimal("99")]
+    matcher = field_matcher(expected)
+
+    for predicted in predictions:
+        assert matcher(predicted) is calculate_field_match(expected, predicted)
+
+
 def test_evaluate_extraction_perfect() -> None:
     """Test evaluation with perfect extraction."""
     expected = [
@@ -124,6 +140,50 @@ def test_evaluate_extraction_multiple_samples() -> None:
     assert report.field_metrics["invoice_number"].precision == 0.5
 
 
+def test_evaluate_extraction_uses_field_match_rules() -> None:
+    """Test that batch evaluation applies the same rules as calculate_field_match."""
+    expected = [
+        InvoiceData(supplier_name="ACME Corp", total_amount=Decimal("100.00")),
+        InvoiceData(supplier_name="Acme\nCorp", total_amount=Decimal("100.00")),
+        InvoiceData(supplier_name="Other", total_amount=Decimal("100.00")),
+    ]
+    predicted = [
+        InvoiceData(supplier_name="  acme corp ", total_amount=Decimal("100.005")),
+        InvoiceData(supplier_name="acme, corp", total_amount=Decimal("100.00")),
+        InvoiceData(supplier_name="Wrong", total_amount=Decimal("100.02")),
+    ]
+
+    report = evaluate_extraction(expected, predicted)
+
+    for field in ("supplier_name", "total_amount"):
+        pairs = [
+            (getattr(e, field), getattr(p, field)) for e, p in zip(expected, predicted, strict=True)
+        ]
+        matched = sum(calculate_field_match(e, p) for e, p in pairs)
+        assert report.field_metrics[field].precision == matched / len(pairs)
+
+
+def test_evaluate_extraction_parallel_matches_serial() -> None:
+    """Test that chunked thread-pool evaluation gives the same report as serial."""
+    expected = [
+        InvoiceData(invoice_number=f"INV-{i}", total_amount=Decimal(i % 7), currency=None)
+        for i in range(1500)
+    ]
+    predicted = [
+        InvoiceData(
+            invoice_number=f"inv-{i}" if i % 3 else None,
+            total_amount=Decimal(i % 5),
+            supplier_name="Acme" if i % 4 == 0 else None,
+        )
+        for i in range(1500)
+    ]
+
+    serial = evaluate_extraction(expected, predicted)
+    parallel = evaluate_extraction(expected, predicted, n_workers=4)
+
+    assert parallel == serial
+
+
 def test_evaluate_extraction_mismatched_lengths() -> None:
     """Test that mismatched list lengths raise error."""
     expected = [InvoiceData()]
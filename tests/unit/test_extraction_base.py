@@ -36,15 +36,13 @@ def test_extraction_result_with_failure() -> None:
     assert result.provider == "test"
 
 
-def test_extraction_provider_is_abstract() -> None:
+def test_extraction_provider_is_abstract(default_settings: Settings) -> None:
     """Test that ExtractionProvider cannot be instantiated directly."""
-    settings = Settings()
-
     with pytest.raises(TypeError, match="Can't instantiate abstract class"):
-        ExtractionProvider(settings)  # type: ignore[abstract]
+        ExtractionProvider(default_settings)  # type: ignore[abstract]
 
 
-def test_extraction_provider_requires_implementation() -> None:
+def test_extraction_provider_requires_implementation(default_settings: Settings) -> None:
     """Test that concrete providers must implement all abstract methods."""
 
     # Create incomplete implementation missing provider_name
@@ -59,13 +57,11 @@ def test_extraction_provider_requires_implementation() -> None:
 
         # Missing: provider_name property
 
-    settings = Settings()
-
     with pytest.raises(TypeError, match="Can't instantiate abstract class"):
-        IncompleteProvider(settings)  # type: ignore[abstract]
+        IncompleteProvider(default_settings)  # type: ignore[abstract]
 
 
-def test_concrete_provider_implementation() -> None:
+def test_concrete_provider_implementation(default_settings: Settings) -> None:
     """Test that properly implemented provider works correctly."""
 
     class TestProvider(ExtractionProvider):
@@ -84,8 +80,7 @@ def test_concrete_provider_implementation() -> None:
         def provider_name(self) -> str:
             return "test"
 
-    settings = Settings()
-    provider = TestProvider(settings)
+    provider = TestProvider(default_settings)
 
     assert provider.provider_name == "test"
     assert provider.is_available() is True
@@ -8,15 +8,26 @@ Tests cover:
 """
 
 import logging
+from unittest.mock import patch
 
 import pytest
 
 from services.extraction.base import ExtractionProvider
-from services.extraction.factory import ProviderRegistry, create_extraction_service
+from services.extraction.factory import (
+    ProviderRegistry,
+    _create_provider,
+    create_extraction_service,
+)
 from services.extraction.openai_provider import OpenAIExtractionProvider
 from services.shared.config import Settings
 
 
+@pytest.fixture(autouse=True)
+def clear_provider_cache() -> None:
+    """Start each test with an empty provider cache."""
+    _create_provider.cache_clear()
+
+
 def test_provider_registry_default_providers() -> None:
     """Test that registry contains default providers."""
     providers = ProviderRegistry.list_providers()
@@ -48,6 +59,30 @@ def test_provider_registry_error_message_lists_available() -> None:
         assert "openai" in error_msg
 
 
+def test_provider_registry_error_message_tracks_registration() -> None:
+    """Test that error message reflects providers registered at runtime."""
+
+    class TestProvider(ExtractionProvider):
+        def extract_invoice_fields(self, ocr_text: str):  # type: ignore
+            pass
+
+        def is_available(self) -> bool:
+            return True
+
+        @property
+        def provider_name(self) -> str:
+            return "test"
+
+    ProviderRegistry.register("test", TestProvider)
+    with pytest.raises(ValueError, match="Available providers: .*test"):
+        ProviderRegistry.get_provider_class("invalid")
+
+    ProviderRegistry.unregister("test")
+    with pytest.raises(ValueError) as exc_info:
+        ProviderRegistry.get_provider_class("invalid")
+    assert "test" not in str(exc_info.value).split("Available providers:")[1]
+
+
 def test_provider_registry_register_new_provider() -> None:
     """Test registering a new provider."""
 
@@ -70,36 +105,65 @@ def test_provider_registry_register_new_provider() -> None:
     assert ProviderRegistry.get_provider_class("test") == TestProvider
 
     # Clean up
-    del ProviderRegistry._providers["test"]
+    ProviderRegistry.unregister("test")
+    assert "test" not in ProviderRegistry.list_providers()
 
 
-def test_create_extraction_service_default() -> None:
+def test_create_extraction_service_default(default_settings: Settings) -> None:
     """Test factory creates OpenAI provider by default."""
-    settings = Settings(_env_file=None)
-    provider = create_extraction_service(settings)
+    provider = create_extraction_service(default_settings)
 
     assert isinstance(provider, OpenAIExtractionProvider)
     assert provider.provider_name == "openai"
 
 
-def test_create_extraction_service_logs_creation(caplog: pytest.LogCaptureFixture) -> None:
-    """Test that factory logs provider creation."""
-    settings = Settings(_env_file=None)
+def test_create_extraction_service_reuses_provider(default_settings: Settings) -> None:
+    """Test factory returns the same provider for identical configuration."""
+    first = create_extraction_service(default_settings)
+    second = create_extraction_service(Settings(_env_file=None))
+    other = create_extraction_service(Settings(_env_file=None, openai_model="gpt-4o"))
+
+    assert first is second
+    assert other is not first
+    assert other.settings.openai_model == "gpt-4o"
+
+
+def test_create_extraction_service_ignores_unrelated_settings(default_settings: Settings) -> None:
+    """Test settings the provider does not read do not create a new provider."""
+    first = create_extraction_service(default_settings)
+    second = create_extraction_service(Settings(_env_file=None, storage_bucket="other"))
+
+    assert first is second
+
 
+@patch.dict("os.environ", {}, clear=True)
+def test_create_extraction_service_warns_once_per_configuration(
+    caplog: pytest.LogCaptureFixture, default_settings: Settings
+) -> None:
+    """Test the availability warning is emitted when the provider is created only."""
+    with caplog.at_level(logging.WARNING):
+        create_extraction_service(default_settings)
+        create_extraction_service(default_settings)
+
+    assert caplog.text.count("not fully available") == 1
+
+
+def test_create_extraction_service_logs_creation(
+    caplog: pytest.LogCaptureFixture, default_settings: Settings
+) -> None:
+    """Test that factory logs provider creation."""
     with caplog.at_level(logging.INFO):
-        create_extraction_service(settings)
+        create_extraction_service(default_settings)
 
     assert "Created extraction provider: openai" in caplog.text
 
 
 def test_create_extraction_service_warns_if_unavailable(
-    caplog: pytest.LogCaptureFixture,
+    caplog: pytest.LogCaptureFixture, default_settings: Settings
 ) -> None:
     """Test that factory warns if provider is not available."""
-    settings = Settings(_env_file=None)
-
     with caplog.at_level(logging.WARNING):
-        provider = create_extraction_service(settings)
+        provider = create_extraction_service(default_settings)
         # OpenAI provider won't be available without API key
 
     if not provider.is_available():
@@ -7,23 +7,59 @@ Tests cover:
 - Error handling for various failure cases
 """
 
+import asyncio
+from collections.abc import Iterator
 from datetime import date
 from decimal import Decimal
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
+from openai import APIConnectionError, AuthenticationError
 
 from services.extraction.base import ExtractionResult
+from services.extraction.openai_provider import OpenAIExtractionProvider
 from services.extraction.schema import InvoiceData
 from services.extraction.service import ExtractionService
 from services.shared.config import Settings
 
 
 @pytest.fixture
-def extraction_service() -> ExtractionService:
+def extraction_service(default_settings: Settings) -> ExtractionService:
     """Create extraction service instance."""
-    settings = Settings()
-    return ExtractionService(settings)
+    return ExtractionService(default_settings)
+
+
+@pytest.fixture
+def no_retry_wait() -> Iterator[MagicMock]:
+    """Skip tenacity backoff sleeps between retry attempts."""
+    with patch.object(OpenAIExtractionProvider._call_openai_with_retry.retry, "sleep") as sleep:
+        yield sleep
+
+
+def _openai_request() -> httpx.Request:
+    """Build the request object OpenAI errors are attached to."""
+    return httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def _openai_response(arguments: str) -> SimpleNamespace:
+    """Build a chat completion carrying a function call with the given arguments.
+
+    Plain attribute tree instead of MagicMock: only the accessed attributes exist.
+    """
+    function_call = SimpleNamespace(arguments=arguments)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(function_call=function_call))]
+    )
+
+
+def _mock_async_client(mock_async_openai_class: MagicMock) -> MagicMock:
+    """Make the patched AsyncOpenAI class return a client usable with async with."""
+    mock_client = MagicMock()
+    mock_client.__aenter__.return_value = mock_client
+    mock_async_openai_class.return_value = mock_client
+    return mock_client
 
 
 @pytest.fixture
@@ -69,6 +105,35 @@ def test_invoice_data_model_all_none() -> None:
     assert invoice.currency == "USD"  # Has default
 
 
+def test_invoice_data_intern_reuses_validation() -> None:
+    """Test InvoiceData.intern validates equal field values once."""
+    InvoiceData.intern(invoice_number="INV-123", total_amount=Decimal("10.00"))
+
+    with patch.object(InvoiceData, "__init__", side_effect=AssertionError("re-validated")):
+        second = InvoiceData.intern(total_amount=Decimal("10.00"), invoice_number="INV-123")
+
+    assert second == InvoiceData(invoice_number="INV-123", total_amount=Decimal("10.00"))
+    assert InvoiceData.intern(invoice_number="INV-456").invoice_number == "INV-456"
+
+
+def test_invoice_data_intern_keeps_decimal_scale() -> None:
+    """Test values that compare equal but differ (Decimal scale) are not merged."""
+    InvoiceData.intern(total_amount=Decimal("100.00"))
+
+    invoice = InvoiceData.intern(total_amount=Decimal("100"))
+
+    assert str(invoice.total_amount) == "100"
+    assert invoice.model_dump(mode="json")["total_amount"] == "100"
+
+
+def test_invoice_data_intern_returns_independent_copies() -> None:
+    """Test modifying one interned invoice does not affect other callers."""
+    first = InvoiceData.intern(invoice_number="INV-789")
+    first.invoice_number = "changed"
+
+    assert InvoiceData.intern(invoice_number="INV-789").invoice_number == "INV-789"
+
+
 def test_extraction_service_initialization(extraction_service: ExtractionService) -> None:
     """Test that extraction service initializes correctly."""
     assert extraction_service is not None
@@ -77,16 +142,16 @@ def test_extraction_service_initialization(extraction_service: ExtractionService
 
 
 @patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
-def test_provider_is_available_with_key() -> None:
+def test_provider_is_available_with_key(default_settings: Settings) -> None:
     """Test is_available returns True when API key is set."""
-    service = ExtractionService(Settings())
+    service = ExtractionService(default_settings)
     assert service.is_available() is True
 
 
 @patch.dict("os.environ", {}, clear=True)
-def test_provider_is_available_without_key() -> None:
+def test_provider_is_available_without_key(default_settings: Settings) -> None:
     """Test is_available returns False when API key is not set."""
-    service = ExtractionService(Settings())
+    service = ExtractionService(default_settings)
     assert service.is_available() is False
 
 
@@ -122,10 +187,7 @@ def test_extract_success(
     mock_client = MagicMock()
     mock_openai_class.return_value = mock_client
 
-    mock_response = MagicMock()
-    mock_response.choices = [MagicMock()]
-    mock_response.choices[0].message.function_call = MagicMock()
-    mock_response.choices[0].message.function_call.arguments = (
+    mock_response = _openai_response(
         '{"invoice_number": "INV-12345", "total_amount": 1100.00, '
         '"currency": "USD", "invoice_date": "2024-01-15"}'
     )
@@ -142,6 +204,30 @@ def test_extract_success(
     mock_client.chat.completions.create.assert_called_once()
 
 
+@patch("services.extraction.openai_provider.OpenAI")
+@patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
+def test_extract_reuses_client(
+    mock_openai_class: MagicMock, extraction_service: ExtractionService
+) -> None:
+    """Test that the OpenAI client is created once and reused across calls."""
+    mock_client = MagicMock()
+    mock_client.api_key = "test-key"
+    mock_openai_class.return_value = mock_client
+    mock_response = _openai_response('{"invoice_number": "INV-1"}')
+    mock_client.chat.completions.create.return_value = mock_response
+
+    extraction_service.extract_invoice_fields("INVOICE #INV-1")
+    extraction_service.extract_invoice_fields("INVOICE #INV-1")
+
+    mock_openai_class.assert_called_once_with(api_key="test-key")
+    assert mock_client.chat.completions.create.call_count == 2
+
+    # Key rotation rebuilds the client
+    with patch.dict("os.environ", {"OPENAI_API_KEY": "rotated-key"}):
+        extraction_service.extract_invoice_fields("INVOICE #INV-1")
+    assert mock_openai_class.call_count == 2
+
+
 @patch("services.extraction.openai_provider.OpenAI")
 @patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
 def test_extract_api_error(
@@ -160,6 +246,24 @@ def test_extract_api_error(
     assert "API connection failed" in result.error
 
 
+@patch("services.extraction.openai_provider.OpenAI")
+@patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
+def test_extract_invalid_function_arguments(
+    mock_openai_class: MagicMock, extraction_service: ExtractionService
+) -> None:
+    """Test extraction reports malformed function_call arguments as a failure."""
+    mock_client = MagicMock()
+    mock_openai_class.return_value = mock_client
+    mock_response = _openai_response('{"invoice_number": ')
+    mock_client.chat.completions.create.return_value = mock_response
+
+    result = extraction_service.extract_invoice_fields("Test invoice")
+
+    assert result.success is False
+    assert result.invoice_data is None
+    assert "Extraction failed" in result.error
+
+
 def test_extraction_result_model() -> None:
     """Test ExtractionResult model."""
     result = ExtractionResult(
@@ -176,22 +280,19 @@ def test_extraction_result_model() -> None:
 @patch("services.extraction.openai_provider.OpenAI")
 @patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
 def test_extract_with_retry_on_transient_error(
-    mock_openai_class: MagicMock, extraction_service: ExtractionService
+    mock_openai_class: MagicMock,
+    extraction_service: ExtractionService,
+    no_retry_wait: MagicMock,
 ) -> None:
     """Test extraction retries on transient errors and succeeds."""
     mock_client = MagicMock()
     mock_openai_class.return_value = mock_client
 
     # First call fails, second succeeds
-    mock_response = MagicMock()
-    mock_response.choices = [MagicMock()]
-    mock_response.choices[0].message.function_call = MagicMock()
-    mock_response.choices[0].message.function_call.arguments = (
-        '{"invoice_number": "INV-RETRY", "total_amount": 500.00}'
-    )
+    mock_response = _openai_response('{"invoice_number": "INV-RETRY", "total_amount": 500.00}')
 
     mock_client.chat.completions.create.side_effect = [
-        Exception("Temporary API error"),  # First attempt fails
+        APIConnectionError(request=_openai_request()),  # First attempt fails
         mock_response,  # Second attempt succeeds
     ]
 
@@ -203,19 +304,24 @@ def test_extract_with_retry_on_transient_error(
     assert result.invoice_data is not None
     assert result.invoice_data.invoice_number == "INV-RETRY"
     assert mock_client.chat.completions.create.call_count == 2  # Retried once
+    assert no_retry_wait.call_count == 1  # Backed off once between attempts
 
 
 @patch("services.extraction.openai_provider.OpenAI")
 @patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
 def test_extract_fails_after_max_retries(
-    mock_openai_class: MagicMock, extraction_service: ExtractionService
+    mock_openai_class: MagicMock,
+    extraction_service: ExtractionService,
+    no_retry_wait: MagicMock,
 ) -> None:
     """Test extraction fails after exhausting all retries."""
     mock_client = MagicMock()
     mock_openai_class.return_value = mock_client
 
     # All attempts fail
-    mock_client.chat.completions.create.side_effect = Exception("Persistent API error")
+    mock_client.chat.completions.create.side_effect = APIConnectionError(
+        message="Persistent API error", request=_openai_request()
+    )
 
     ocr_text = "Test invoice"
     result = extraction_service.extract_invoice_fields(ocr_text)
@@ -226,3 +332,130 @@ def test_extract_fails_after_max_retries(
     assert "Extraction failed" in result.error
     assert "Persistent API error" in result.error
     assert mock_client.chat.completions.create.call_count == 3  # Max 3 attempts
+
+
+@patch("services.extraction.openai_provider.OpenAI")
+@patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
+def test_extract_does_not_retry_permanent_error(
+    mock_openai_class: MagicMock,
+    extraction_service: ExtractionService,
+    no_retry_wait: MagicMock,
+) -> None:
+    """Test permanent errors (e.g. invalid API key) fail without retrying."""
+    mock_client = MagicMock()
+    mock_openai_class.return_value = mock_client
+    mock_client.chat.completions.create.side_effect = AuthenticationError(
+        "Invalid API key",
+        response=httpx.Response(401, request=_openai_request()),
+        body=None,
+    )
+
+    result = extraction_service.extract_invoice_fields("Test invoice")
+
+    assert result.success is False
+    assert "Invalid API key" in result.error
+    assert mock_client.chat.completions.create.call_count == 1
+    no_retry_wait.assert_not_called()
+
+
+@patch("services.extraction.openai_provider.AsyncOpenAI")
+@patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
+async def test_extract_batch_returns_results_in_order(
+    mock_async_openai_class: MagicMock, extraction_service: ExtractionService
+) -> None:
+    """Test batch extraction returns one result per text, in input order."""
+    mock_client = _mock_async_client(mock_async_openai_class)
+
+    def respond(**kwargs: object) -> SimpleNamespace:
+        prompt = kwargs["messages"][1]["content"]  # type: ignore[index]
+        number = "INV-A" if "INV-A" in prompt else "INV-B"
+        return _openai_response(f'{{"invoice_number": "{number}"}}')
+
+    mock_client.chat.completions.create = AsyncMock(side_effect=respond)
+
+    results = await extraction_service.extract_invoice_fields_batch(
+        ["INVOICE #INV-A", "", "INVOICE #INV-B"]
+    )
+
+    assert [r.success for r in results] == [True, False, True]
+    assert results[0].invoice_data.invoice_number == "INV-A"
+    assert "Empty OCR text" in results[1].error
+    assert results[2].invoice_data.invoice_number == "INV-B"
+    assert mock_client.chat.completions.create.await_count == 2
+    mock_async_openai_class.assert_called_once_with(api_key="test-key")
+
+
+@patch("services.extraction.openai_provider.AsyncOpenAI")
+@patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
+async def test_extract_batch_bounds_concurrency(mock_async_openai_class: MagicMock) -> None:
+    """Test batch extraction keeps at most openai_concurrency calls in flight."""
+    provider = ExtractionService(Settings(_env_file=None, openai_concurrency=2))
+    mock_client = _mock_async_client(mock_async_openai_class)
+    in_flight = 0
+    max_in_flight = 0
+
+    async def respond(**kwargs: object) -> SimpleNamespace:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return _openai_response('{"invoice_number": "INV-1"}')
+
+    mock_client.chat.completions.create = AsyncMock(side_effect=respond)
+
+    results = await provider.extract_invoice_fields_batch(["INVOICE #INV-1"] * 5)
+
+    assert all(r.success for r in results)
+    assert max_in_flight == 2
+
+
+@patch("services.extraction.openai_provider.AsyncOpenAI")
+@patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
+async def test_extract_batch_isolates_failures(
+    mock_async_openai_class: MagicMock, extraction_service: ExtractionService
+) -> None:
+    """Test one failing document does not fail the rest of the batch."""
+    mock_client = _mock_async_client(mock_async_openai_class)
+    response = _openai_response('{"invoice_number": "INV-1"}')
+    mock_client.chat.completions.create = AsyncMock(
+        side_effect=[response, Exception("Bad request")]
+    )
+
+    results = await extraction_service.extract_invoice_fields_batch(["INVOICE 1", "INVOICE 2"])
+
+    assert sorted(r.success for r in results) == [False, True]
+    assert any("Bad request" in (r.error or "") for r in results)
+
+
+@patch("services.extraction.openai_provider.AsyncOpenAI")
+@patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
+def test_extract_batch_under_separate_event_loops(
+    mock_async_openai_class: MagicMock, extraction_service: ExtractionService
+) -> None:
+    """Test each batch uses and closes its own client, so a cached provider
+    keeps working when batches run under separate asyncio.run calls."""
+    mock_client = _mock_async_client(mock_async_openai_class)
+    mock_client.chat.completions.create = AsyncMock(
+        return_value=_openai_response('{"invoice_number": "INV-1"}')
+    )
+
+    for _ in range(2):
+        results = asyncio.run(extraction_service.extract_invoice_fields_batch(["INVOICE #INV-1"]))
+        assert results[0].success is True
+
+    assert mock_async_openai_class.call_count == 2
+    assert mock_client.__aexit__.await_count == 2
+
+
+@patch("services.extraction.openai_provider.AsyncOpenAI")
+@patch.dict("os.environ", {}, clear=True)
+async def test_extract_batch_without_api_key(
+    mock_async_openai_class: MagicMock, extraction_service: ExtractionService
+) -> None:
+    """Test batch extraction fails every text without creating a client."""
+    results = await extraction_service.extract_invoice_fields_batch(["INVOICE 1", "INVOICE 2"])
+
+    assert [r.success for r in results] == [False, False]
+    assert all("OPENAI_API_KEY" in (r.error or "") for r in results)
+    mock_async_openai_class.assert_not_called()
@@ -7,33 +7,64 @@ Tests cover:
 - Field mapping to gold format
 """
 
-import tempfile
+import io
 from pathlib import Path
+from typing import Final
 
 import pytest
 
 from scripts.load_external_dataset import (
     ExternalInvoiceRecord,
+    _parse_csv_stream,
     convert_to_gold_format,
     parse_csv_file,
     parse_date,
     parse_decimal,
 )
 
+# CSV fixtures, built once at import. CSV escapes quotes inside fields by doubling them.
+_CSV_HEADER: Final[str] = "File Name,Json Data,OCRed Text\n"
+_GOLD_JSON_COMPLETE: Final[str] = (
+    '{"invoice": {"invoice_number": "123", "invoice_date": "01/15/2024", '
+    '"due_date": "", "seller_name": "Acme", "seller_address": "123 Main", '
+    '"client_name": "Customer"}, "subtotal": {"tax": "10.00", "total": "110.00"}, '
+    '"payment_instructions": {}}'
+)
+_GOLD_JSON_COMPLETE_ESCAPED: Final[str] = _GOLD_JSON_COMPLETE.replace('"', '""')
+_GOLD_JSON_MINIMAL: Final[str] = (
+    '{"invoice": {"invoice_number": "456"}, "subtotal": {}, "payment_instructions": {}}'
+)
+_GOLD_JSON_MINIMAL_ESCAPED: Final[str] = _GOLD_JSON_MINIMAL.replace('"', '""')
+_CSV_VALID: Final[str] = (
+    f'{_CSV_HEADER}test-001.jpg,"{_GOLD_JSON_COMPLETE_ESCAPED}",Sample OCR text\n'
+)
+_CSV_WITH_INVALID_JSON_ROW: Final[str] = (
+    f"{_CSV_HEADER}"
+    'test-001.jpg,"{invalid json}",Text 1\n'
+    f'test-002.jpg,"{_GOLD_JSON_MINIMAL_ESCAPED}",Text 2\n'
+)
+_CSV_WRONG_COLUMNS: Final[str] = "Wrong,Columns,Here\n1,2,3\n"
+
 # --- Date Parsing Tests ---
 
 
-def test_parse_date_mm_dd_yyyy() -> None:
+@pytest.mark.parametrize(
+    ("date_str", "expected"),
+    [
+        ("02/23/2021", "2021-02-23"),
+        ("12/31/2024", "2024-12-31"),
+        ("01/01/2020", "2020-01-01"),
+    ],
+)
+def test_parse_date_mm_dd_yyyy(date_str: str, expected: str) -> None:
     """Test parsing MM/DD/YYYY format."""
-    assert parse_date("02/23/2021") == "2021-02-23"
-    assert parse_date("12/31/2024") == "2024-12-31"
-    assert parse_date("01/01/2020") == "2020-01-01"
+    assert parse_date(date_str) == expected
 
 
-def test_parse_date_yyyy_mm_dd() -> None:
+@pytest.mark.parametrize("date_str", ["2021-02-23", "2024-12-31"])
+def test_parse_date_yyyy_mm_dd(date_str: str) -> None:
     """Test parsing YYYY-MM-DD format (pass through)."""
-    assert parse_date("2021-02-23") == "2021-02-23"
-    assert parse_date("2024-12-31") == "2024-12-31"
+    assert parse_date(date_str) == date_str
 
 
 def test_parse_date_empty() -> None:
@@ -52,43 +83,35 @@ def test_parse_date_invalid() -> None:
 # --- Decimal Parsing Tests ---
 
 
-def test_parse_decimal_simple() -> None:
-    """Test parsing simple decimal strings."""
-    assert parse_decimal("232.95") == 232.95
-    assert parse_decimal("21.18") == 21.18
-    assert parse_decimal("0.00") == 0.0
-
-
-def test_parse_decimal_with_commas() -> None:
-    """Test parsing decimals with thousand separators (US format)."""
-    assert parse_decimal("1,234.56") == 1234.56
-    assert parse_decimal("10,000.00") == 10000.0
-
-
-def test_parse_decimal_european_format() -> None:
-    """Test parsing European format (comma as decimal separator)."""
-    assert parse_decimal("360,58") == 360.58
-    assert parse_decimal("32,78") == 32.78
-    assert parse_decimal("211,77") == 211.77
-    assert parse_decimal("1234,5") == 1234.5
-
-
-def test_parse_decimal_with_currency() -> None:
-    """Test parsing decimals with currency symbols."""
-    assert parse_decimal("$232.95") == 232.95
-    assert parse_decimal("$ 100.00") == 100.0
-
-
-def test_parse_decimal_empty() -> None:
-    """Test parsing empty decimal values."""
-    assert parse_decimal("") is None
-    assert parse_decimal("   ") is None
-
-
-def test_parse_decimal_invalid() -> None:
-    """Test parsing invalid decimal values."""
-    assert parse_decimal("not-a-number") is None
-    assert parse_decimal("abc") is None
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        # Simple decimals
+        ("232.95", 232.95),
+        ("21.18", 21.18),
+        ("0.00", 0.0),
+        # Thousand separators (US format)
+        ("1,234.56", 1234.56),
+        ("10,000.00", 10000.0),
+        # European format (comma as decimal separator)
+        ("360,58", 360.58),
+        ("32,78", 32.78),
+        ("211,77", 211.77),
+        ("1234,5", 1234.5),
+        # Currency symbols
+        ("$232.95", 232.95),
+        ("$ 100.00", 100.0),
+        # Empty values
+        ("", None),
+        ("   ", None),
+        # Invalid values
+        ("not-a-number", None),
+        ("abc", None),
+    ],
+)
+def test_parse_decimal(value: str, expected: float | None) -> None:
+    """Test parsing decimal strings in supported formats, and rejecting others."""
+    assert parse_decimal(value) == expected
 
 
 # --- CSV Parsing Tests ---
@@ -96,28 +119,24 @@ def test_parse_decimal_invalid() -> None:
 
 def test_parse_csv_file_valid() -> None:
     """Test parsing valid CSV file."""
-    json_data = (
-        '{"invoice": {"invoice_number": "123", "invoice_date": "01/15/2024", '
-        '"due_date": "", "seller_name": "Acme", "seller_address": "123 Main", '
-        '"client_name": "Customer"}, "subtotal": {"tax": "10.00", "total": "110.00"}, '
-        '"payment_instructions": {}}'
-    )
-    # CSV uses double quotes to escape quotes inside fields
-    escaped_json = json_data.replace('"', '""')
-    csv_content = f'File Name,Json Data,OCRed Text\ntest-001.jpg,"{escaped_json}",Sample OCR text\n'
+    records = _parse_csv_stream(io.StringIO(_CSV_VALID))
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False, encoding="utf-8") as f:
-        f.write(csv_content)
-        csv_path = Path(f.name)
+    assert len(records) == 1
+    assert records[0].file_name == "test-001.jpg"
+    assert records[0].ocr_text == "Sample OCR text"
+    assert records[0].json_data["invoice"]["invoice_number"] == "123"
 
-    try:
-        records = parse_csv_file(csv_path)
-        assert len(records) == 1
-        assert records[0].file_name == "test-001.jpg"
-        assert records[0].ocr_text == "Sample OCR text"
-        assert records[0].json_data["invoice"]["invoice_number"] == "123"
-    finally:
-        csv_path.unlink()
+
+def test_parse_csv_file_reads_from_disk(tmp_path: Path) -> None:
+    """Test parse_csv_file reads and parses a CSV file on disk."""
+    # write_text closes the file before parse_csv_file reopens it (required on
+    # Windows), and pytest removes tmp_path, so no unlink is needed
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text(_CSV_VALID, encoding="utf-8")
+
+    records = parse_csv_file(csv_path)
+    assert len(records) == 1
+    assert records[0].json_data["invoice"]["invoice_number"] == "123"
 
 
 def test_parse_csv_file_not_found() -> None:
@@ -128,42 +147,17 @@ def test_parse_csv_file_not_found() -> None:
 
 def test_parse_csv_file_invalid_columns() -> None:
     """Test parsing CSV with missing columns raises error."""
-    csv_content = "Wrong,Columns,Here\n1,2,3\n"
-
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False, encoding="utf-8") as f:
-        f.write(csv_content)
-        csv_path = Path(f.name)
-
-    try:
-        with pytest.raises(ValueError, match="missing required columns"):
-            parse_csv_file(csv_path)
-    finally:
-        csv_path.unlink()
+    with pytest.raises(ValueError, match="missing required columns"):
+        _parse_csv_stream(io.StringIO(_CSV_WRONG_COLUMNS))
 
 
 def test_parse_csv_file_invalid_json_skipped() -> None:
     """Test that rows with invalid JSON are skipped."""
-    valid_json = (
-        '{"invoice": {"invoice_number": "456"}, "subtotal": {}, "payment_instructions": {}}'
-    )
-    escaped_json = valid_json.replace('"', '""')
-    csv_content = (
-        "File Name,Json Data,OCRed Text\n"
-        'test-001.jpg,"{invalid json}",Text 1\n'
-        f'test-002.jpg,"{escaped_json}",Text 2\n'
-    )
+    records = _parse_csv_stream(io.StringIO(_CSV_WITH_INVALID_JSON_ROW))
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False, encoding="utf-8") as f:
-        f.write(csv_content)
-        csv_path = Path(f.name)
-
-    try:
-        records = parse_csv_file(csv_path)
-        # Only valid row should be parsed
-        assert len(records) == 1
-        assert records[0].file_name == "test-002.jpg"
-    finally:
-        csv_path.unlink()
+    # Only valid row should be parsed
+    assert len(records) == 1
+    assert records[0].file_name == "test-002.jpg"
 
 
 # --- Gold Format Conversion Tests ---
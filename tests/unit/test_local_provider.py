@@ -10,7 +10,11 @@ Tests cover:
 """
 
 import logging
-import sys
+from collections.abc import Iterator
+from datetime import date
+from decimal import Decimal
+from importlib.util import find_spec
+from typing import Final
 from unittest.mock import patch
 
 import pytest
@@ -18,76 +22,186 @@ import pytest
 from services.extraction.local_provider import LocalExtractionProvider
 from services.shared.config import Settings
 
+# Extraction imports torch (and loading the model needs transformers), so tests
+# that extract are skipped where the local model dependencies are not installed
+requires_model_dependencies = pytest.mark.skipif(
+    find_spec("torch") is None or find_spec("transformers") is None,
+    reason="torch/transformers not installed - skipping local model tests",
+)
+
+# Shared by the date-format cases, which all encode the same invoice date
+_TEST_INVOICE_PREFIX: Final[str] = "INVOICE #TEST\n"
+_EXPECTED_INVOICE_DATE: Final[date] = date(2025, 11, 26)
+
+# Invoice texts for the extraction tests
+_INVOICE_DATES: Final[
+    str
+] = """
+    INVOICE #12345
+    Invoice Date: November 26, 2025
+    Due Date: 12/15/2025
+    Total: $500.00
+    """
+
+_INVOICE_AMOUNTS: Final[
+    str
+] = """
+    INVOICE #TEST-001
+    Subtotal: $1,234.56
+    Tax: $123.45
+    Total: $1,358.01
+    """
+
+_INVOICE_ENTITIES: Final[
+    str
+] = """
+    INVOICE #99999
+    From: ACME Corporation
+    Bill To: John Doe Industries
+    Total: $999.99
+    """
+
+_INVOICE_FULL: Final[
+    str
+] = """
+    INVOICE #12345
+    Date: 2025-11-26
+    From: Supplier Inc
+    Total: $1000.00
+    """
+
+_INVOICE_PARTIAL: Final[str] = "INVOICE #12345"
+
+_REALISTIC_INVOICE: Final[
+    str
+] = """
+    INVOICE #INV-2025-001
+
+    Invoice Date: November 26, 2025
+    Due Date: December 26, 2025
+
+    From: Tech Solutions LLC
+    123 Main Street
+
+    Bill To: Enterprise Corp
+    456 Business Ave
+
+    Subtotal: $5,420.00
+    Tax (10%): $542.00
+    Total: $5,962.00
+    """
+
+
+class _LogProbe(logging.Handler):
+    """Collects raw log messages without running them through a Formatter."""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.INFO)
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
 
 @pytest.fixture
-def local_provider() -> LocalExtractionProvider:
-    """Create local provider instance."""
-    settings = Settings(_env_file=None)
-    return LocalExtractionProvider(settings)
+def log_probe() -> Iterator[_LogProbe]:
+    """Attach a log probe to the local provider logger at INFO level."""
+    logger = logging.getLogger("services.extraction.local_provider")
+    probe = _LogProbe()
+    previous_level = logger.level
+    logger.addHandler(probe)
+    logger.setLevel(logging.INFO)
+    yield probe
+    logger.removeHandler(probe)
+    logger.setLevel(previous_level)
+
+
+@pytest.fixture(scope="module")
+def local_provider(default_settings: Settings) -> LocalExtractionProvider:
+    """Create local provider shared by the module (Donut model loads once)."""
+    return LocalExtractionProvider(default_settings)
+
+
+@pytest.fixture
+def fresh_provider(default_settings: Settings) -> LocalExtractionProvider:
+    """Create local provider whose model has not been loaded yet."""
+    return LocalExtractionProvider(default_settings)
+
+
+@pytest.fixture
+def stubbed_provider(
+    local_provider: LocalExtractionProvider, monkeypatch: pytest.MonkeyPatch
+) -> LocalExtractionProvider:
+    """Shared provider with sentinel model objects, so Donut is never loaded.
+
+    For tests that only exercise the regex field extraction. The real
+    model state is restored after the test.
+    """
+    monkeypatch.setattr(local_provider, "_model", object())
+    monkeypatch.setattr(local_provider, "_processor", object())
+    monkeypatch.setattr(local_provider, "_device", "cpu")
+    return local_provider
 
 
-def test_local_provider_initialization(local_provider: LocalExtractionProvider) -> None:
+def test_local_provider_initialization(fresh_provider: LocalExtractionProvider) -> None:
     """Test that local provider initializes without loading model."""
-    assert local_provider is not None
-    assert isinstance(local_provider.settings, Settings)
-    assert local_provider.provider_name == "local"
+    assert fresh_provider is not None
+    assert isinstance(fresh_provider.settings, Settings)
+    assert fresh_provider.provider_name == "local"
     # Model should not be loaded yet (lazy loading)
-    assert local_provider._model is None
-    assert local_provider._processor is None
+    assert fresh_provider._model is None
+    assert fresh_provider._processor is None
 
 
-def test_local_provider_lazy_loads_model(local_provider: LocalExtractionProvider) -> None:
+@requires_model_dependencies
+def test_local_provider_lazy_loads_model(fresh_provider: LocalExtractionProvider) -> None:
     """Test that model is lazy-loaded on first extraction."""
     # Model not loaded initially
-    assert local_provider._model is None
+    assert fresh_provider._model is None
 
     # Trigger extraction (will load model)
-    result = local_provider.extract_invoice_fields("INVOICE #12345")
+    result = fresh_provider.extract_invoice_fields("INVOICE #12345")
 
     # Model should be loaded now
-    assert local_provider._model is not None
-    assert local_provider._processor is not None
+    assert fresh_provider._model is not None
+    assert fresh_provider._processor is not None
     assert result.success is True
 
 
-def test_local_provider_is_available_with_dependencies() -> None:
+@requires_model_dependencies
+def test_local_provider_is_available_with_dependencies(default_settings: Settings) -> None:
     """Test availability check when dependencies are installed."""
-    settings = Settings(_env_file=None)
-    provider = LocalExtractionProvider(settings)
+    provider = LocalExtractionProvider(default_settings)
 
     # Should be available (torch and transformers installed in our test env)
     assert provider.is_available() is True
 
 
-def test_local_provider_is_not_available_without_dependencies() -> None:
+def test_local_provider_is_not_available_without_dependencies(
+    default_settings: Settings,
+) -> None:
     """Test availability check when dependencies are missing."""
-    # Temporarily remove torch from sys.modules
-    torch_module = sys.modules.get("torch")
-    if torch_module:
-        del sys.modules["torch"]
-
-    settings = Settings(_env_file=None)
-    provider = LocalExtractionProvider(settings)
+    provider = LocalExtractionProvider(default_settings)
 
-    # Should not be available if torch is missing
-    with patch.dict(sys.modules, {"torch": None}):
+    # Should not be available if torch is missing (sys.modules is left untouched)
+    with patch(
+        "services.extraction.local_provider.find_spec",
+        side_effect=lambda name: None if name == "torch" else object(),
+    ):
         assert provider.is_available() is False
 
-    # Restore torch
-    if torch_module:
-        sys.modules["torch"] = torch_module
-
 
 def test_local_provider_name(local_provider: LocalExtractionProvider) -> None:
     """Test provider name is 'local'."""
     assert local_provider.provider_name == "local"
 
 
+@requires_model_dependencies
 def test_local_provider_extract_invoice_number(
-    local_provider: LocalExtractionProvider,
+    stubbed_provider: LocalExtractionProvider,
 ) -> None:
     """Test that extraction can parse invoice numbers from text."""
-    result = local_provider.extract_invoice_fields("INVOICE: INV-2024-001")
+    result = stubbed_provider.extract_invoice_fields("INVOICE: INV-2024-001")
 
     assert result.success is True
     assert result.invoice_data is not None
@@ -96,27 +210,29 @@ def test_local_provider_extract_invoice_number(
     assert result.error is None
 
 
-def test_local_provider_extract_empty_text(local_provider: LocalExtractionProvider) -> None:
+def test_local_provider_extract_empty_text(fresh_provider: LocalExtractionProvider) -> None:
     """Test that empty text is handled correctly."""
-    result = local_provider.extract_invoice_fields("")
+    result = fresh_provider.extract_invoice_fields("")
 
     assert result.success is False
     assert result.invoice_data is None
     assert "Empty OCR text" in result.error  # type: ignore
     assert result.provider == "local"
     # Should not load model for empty text
-    assert local_provider._model is None
+    assert fresh_provider._model is None
 
 
+@requires_model_dependencies
 def test_local_provider_logs_model_loading(
     local_provider: LocalExtractionProvider,
-    caplog: pytest.LogCaptureFixture,
+    log_probe: _LogProbe,
 ) -> None:
     """Test that model loading is logged."""
-    with caplog.at_level(logging.INFO):
-        local_provider.extract_invoice_fields("Test text")
+    local_provider.extract_invoice_fields("Test text")
 
-    assert "Loading Donut model" in caplog.text or "Extracting invoice fields" in caplog.text
+    assert any(
+        "Loading Donut model" in m or "Extracting invoice fields" in m for m in log_probe.messages
+    )
 
 
 def test_local_provider_can_be_created_via_settings() -> None:
@@ -126,6 +242,7 @@ def test_local_provider_can_be_created_via_settings() -> None:
     assert settings.extraction_provider == "local"
 
 
+@requires_model_dependencies
 def test_local_provider_multiple_extractions_reuse_model(
     local_provider: LocalExtractionProvider,
 ) -> None:
@@ -143,18 +260,10 @@ def test_local_provider_multiple_extractions_reuse_model(
     assert model_id_1 == model_id_2  # Same model instance
 
 
-def test_local_provider_extract_dates(local_provider: LocalExtractionProvider) -> None:
+@requires_model_dependencies
+def test_local_provider_extract_dates(stubbed_provider: LocalExtractionProvider) -> None:
     """Test date extraction in multiple formats."""
-    from datetime import date
-
-    invoice_text = """
-    INVOICE #12345
-    Invoice Date: November 26, 2025
-    Due Date: 12/15/2025
-    Total: $500.00
-    """
-
-    result = local_provider.extract_invoice_fields(invoice_text)
+    result = stubbed_provider.extract_invoice_fields(_INVOICE_DATES)
 
     assert result.success is True
     assert result.invoice_data is not None
@@ -162,18 +271,10 @@ def test_local_provider_extract_dates(local_provider: LocalExtractionProvider) -
     assert result.invoice_data.due_date == date(2025, 12, 15)
 
 
-def test_local_provider_extract_amounts(local_provider: LocalExtractionProvider) -> None:
+@requires_model_dependencies
+def test_local_provider_extract_amounts(stubbed_provider: LocalExtractionProvider) -> None:
     """Test monetary amount extraction."""
-    from decimal import Decimal
-
-    invoice_text = """
-    INVOICE #TEST-001
-    Subtotal: $1,234.56
-    Tax: $123.45
-    Total: $1,358.01
-    """
-
-    result = local_provider.extract_invoice_fields(invoice_text)
+    result = stubbed_provider.extract_invoice_fields(_INVOICE_AMOUNTS)
 
     assert result.success is True
     assert result.invoice_data is not None
@@ -182,16 +283,10 @@ def test_local_provider_extract_amounts(local_provider: LocalExtractionProvider)
     assert result.invoice_data.total_amount == Decimal("1358.01")
 
 
-def test_local_provider_extract_entities(local_provider: LocalExtractionProvider) -> None:
+@requires_model_dependencies
+def test_local_provider_extract_entities(stubbed_provider: LocalExtractionProvider) -> None:
     """Test entity (supplier/customer) extraction."""
-    invoice_text = """
-    INVOICE #99999
-    From: ACME Corporation
-    Bill To: John Doe Industries
-    Total: $999.99
-    """
-
-    result = local_provider.extract_invoice_fields(invoice_text)
+    result = stubbed_provider.extract_invoice_fields(_INVOICE_ENTITIES)
 
     assert result.success is True
     assert result.invoice_data is not None
@@ -199,72 +294,50 @@ def test_local_provider_extract_entities(local_provider: LocalExtractionProvider
     assert result.invoice_data.customer_name == "John Doe Industries"
 
 
+@requires_model_dependencies
 def test_local_provider_confidence_scoring(
-    local_provider: LocalExtractionProvider,
+    stubbed_provider: LocalExtractionProvider,
 ) -> None:
     """Test confidence scoring based on field extraction."""
     # Full extraction - high confidence
-    full_text = """
-    INVOICE #12345
-    Date: 2025-11-26
-    From: Supplier Inc
-    Total: $1000.00
-    """
-    result_full = local_provider.extract_invoice_fields(full_text)
+    result_full = stubbed_provider.extract_invoice_fields(_INVOICE_FULL)
     assert result_full.invoice_data is not None
     assert result_full.invoice_data.confidence_score == 1.0  # All critical fields
 
     # Partial extraction - lower confidence
-    partial_text = "INVOICE #12345"
-    result_partial = local_provider.extract_invoice_fields(partial_text)
+    result_partial = stubbed_provider.extract_invoice_fields(_INVOICE_PARTIAL)
     assert result_partial.invoice_data is not None
     assert result_partial.invoice_data.confidence_score == 0.3  # Only invoice number
 
 
+@requires_model_dependencies
+@pytest.mark.parametrize(
+    "text",
+    [
+        pytest.param(text, id=text)
+        for text in (
+            "Date: 2025-11-26",
+            "Date: 11/26/2025",
+            "Date: November 26, 2025",
+            "Date: Nov 26, 2025",
+        )
+    ],
+)
 def test_local_provider_handles_various_date_formats(
-    local_provider: LocalExtractionProvider,
+    stubbed_provider: LocalExtractionProvider, text: str
 ) -> None:
     """Test parsing of various date formats."""
-    from datetime import date
-
-    test_cases = [
-        ("Date: 2025-11-26", date(2025, 11, 26)),
-        ("Date: 11/26/2025", date(2025, 11, 26)),
-        ("Date: November 26, 2025", date(2025, 11, 26)),
-        ("Date: Nov 26, 2025", date(2025, 11, 26)),
-    ]
-
-    for text, expected_date in test_cases:
-        result = local_provider.extract_invoice_fields(f"INVOICE #TEST\n{text}")
-        assert result.invoice_data is not None
-        assert result.invoice_data.invoice_date == expected_date, f"Failed to parse: {text}"
+    result = stubbed_provider.extract_invoice_fields(_TEST_INVOICE_PREFIX + text)
+    assert result.invoice_data is not None
+    assert result.invoice_data.invoice_date == _EXPECTED_INVOICE_DATE
 
 
+@requires_model_dependencies
 def test_local_provider_comprehensive_invoice(
-    local_provider: LocalExtractionProvider,
+    stubbed_provider: LocalExtractionProvider,
 ) -> None:
     """Test extraction from a realistic invoice."""
-    from datetime import date
-    from decimal import Decimal
-
-    realistic_invoice = """
-    INVOICE #INV-2025-001
-
-    Invoice Date: November 26, 2025
-    Due Date: December 26, 2025
-
-    From: Tech Solutions LLC
-    123 Main Street
-
-    Bill To: Enterprise Corp
-    456 Business Ave
-
-    Subtotal: $5,420.00
-    Tax (10%): $542.00
-    Total: $5,962.00
-    """
-
-    result = local_provider.extract_invoice_fields(realistic_invoice)
+    result = stubbed_provider.extract_invoice_fields(_REALISTIC_INVOICE)
 
     assert result.success is True
     assert result.invoice_data is not None
@@ -6,6 +6,7 @@ Tests cover:
 - Configuration management
 """
 
+import io
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -16,21 +17,32 @@ from services.ocr.service import OCRResult, OCRService
 from services.shared.config import Settings
 
 
+def _encode_blank_png() -> bytes:
+    """Encode a simple white 200x50 image as PNG."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (200, 50), color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# Encoded once at import; every test image has the same content
+_BLANK_PNG_BYTES = _encode_blank_png()
+
+
 @pytest.fixture
 def test_image_path(tmp_path: Path) -> Path:
     """Create a simple test image with text."""
     img_path = tmp_path / "test_image.png"
-    # Create a simple white image
-    img = Image.new("RGB", (200, 50), color="white")
-    img.save(img_path)
+    img_path.write_bytes(_BLANK_PNG_BYTES)
     return img_path
 
 
-@pytest.fixture
-def ocr_service() -> OCRService:
-    """Create OCR service instance."""
-    settings = Settings()
-    return OCRService(settings)
+@pytest.fixture(scope="module")
+def ocr_service(default_settings: Settings) -> OCRService:
+    """Create OCR service instance shared by the module.
+
+    extract_text keeps no per-call state, so tests can share one instance.
+    """
+    return OCRService(default_settings)
 
 
 def test_ocr_service_initialization(ocr_service: OCRService) -> None:
@@ -69,8 +81,8 @@ def test_extract_text_file_not_found(ocr_service: OCRService) -> None:
 
 def test_extract_text_invalid_image(ocr_service: OCRService, tmp_path: Path) -> None:
     """Test error handling for invalid image file."""
-    invalid_file = tmp_path / "not_an_image.txt"
-    invalid_file.write_text("This is not an image")
+    invalid_file = tmp_path / "not_an_image.bin"
+    invalid_file.write_bytes(b"")
 
     result = ocr_service.extract_text(invalid_file)
 
@@ -4,6 +4,7 @@ Tests the Ollama-based extraction provider with mocked HTTP calls.
 """
 
 import json
+from collections.abc import Iterator
 from unittest.mock import MagicMock, patch
 
 import httpx
@@ -13,7 +14,7 @@ from services.extraction.ollama_provider import OllamaExtractionProvider
 from services.shared.config import Settings
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def settings() -> Settings:
     """Create test settings with Ollama provider."""
     return Settings(
@@ -23,10 +24,62 @@ def settings() -> Settings:
     )
 
 
+@pytest.fixture(scope="module")
+def provider(settings: Settings) -> Iterator[OllamaExtractionProvider]:
+    """Create Ollama provider shared by the module, closing its client afterwards."""
+    with OllamaExtractionProvider(settings) as provider:
+        yield provider
+
+
+@pytest.fixture(autouse=True)
+def reset_provider_caches(provider: OllamaExtractionProvider) -> None:
+    """Start each test without availability or extraction results cached by earlier tests."""
+    provider.clear_availability_cache()
+    provider._result_cache.clear()
+
+
+class _OllamaStub:
+    """Serves canned Ollama /api/generate responses through httpx.MockTransport."""
+
+    def __init__(self) -> None:
+        self.output = ""  # Model output returned in the "response" field
+        self.stream_chunks: list[str] = []  # Model output pieces for streaming requests
+        self.chunks_sent = 0
+        self.status_code = 200
+        self.requests: list[httpx.Request] = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.path != "/api/generate":
+            return httpx.Response(404)
+        if json.loads(request.content)["stream"]:
+            return httpx.Response(self.status_code, content=self._stream_lines())
+        return httpx.Response(self.status_code, json={"response": self.output})
+
+    def _stream_lines(self) -> Iterator[bytes]:
+        for piece in self.stream_chunks:
+            self.chunks_sent += 1
+            yield json.dumps({"response": piece, "done": False}).encode() + b"\n"
+        yield json.dumps({"response": "", "done": True}).encode() + b"\n"
+
+
 @pytest.fixture
-def provider(settings: Settings) -> OllamaExtractionProvider:
-    """Create Ollama provider instance."""
-    return OllamaExtractionProvider(settings)
+def ollama_stub() -> _OllamaStub:
+    """Create a stub Ollama server."""
+    return _OllamaStub()
+
+
+@pytest.fixture
+def served_provider(settings: Settings, ollama_stub: _OllamaStub) -> OllamaExtractionProvider:
+    """Create Ollama provider whose HTTP requests are answered by the stub server."""
+    return OllamaExtractionProvider(settings, transport=httpx.MockTransport(ollama_stub.handle))
+
+
+@pytest.fixture
+def no_retry_wait() -> Iterator[MagicMock]:
+    """Skip tenacity backoff sleeps between retry attempts."""
+    with patch.object(OllamaExtractionProvider._call_ollama_with_retry.retry, "sleep") as sleep:
+        yield sleep
 
 
 class TestOllamaExtractionProviderProperties:
@@ -61,6 +114,34 @@ class TestOllamaExtractionProviderProperties:
         with patch.object(provider._client, "get", return_value=mock_response):
             assert provider.is_available() is False
 
+    def test_is_available_reuses_recent_result(self, provider: OllamaExtractionProvider) -> None:
+        """Should query the server once within the availability TTL."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"models": [{"name": "qwen2.5:7b"}]}
+
+        with patch.object(provider._client, "get", return_value=mock_response) as mock_get:
+            assert provider.is_available() is True
+            assert provider.is_available() is True
+            assert mock_get.call_count == 1
+
+            provider.clear_availability_cache()
+            assert provider.is_available() is True
+            assert mock_get.call_count == 2
+
+    def test_is_available_rechecks_after_ttl(self, settings: Settings) -> None:
+        """Should query the server again once the cached result expires."""
+        provider = OllamaExtractionProvider(
+            settings.model_copy(update={"ollama_availability_ttl": 0})
+        )
+
+        with patch.object(
+            provider._client, "get", side_effect=httpx.ConnectError("Connection refused")
+        ) as mock_get:
+            assert provider.is_available() is False
+            assert provider.is_available() is False
+            assert mock_get.call_count == 2
+
 
 class TestOllamaExtraction:
     """Test invoice extraction functionality."""
@@ -80,78 +161,174 @@ class TestOllamaExtraction:
         assert result.success is False
         assert result.error == "Empty OCR text provided"
 
-    def test_extract_successful_response(self, provider: OllamaExtractionProvider) -> None:
+    def test_extract_successful_response(
+        self, ollama_stub: _OllamaStub, served_provider: OllamaExtractionProvider
+    ) -> None:
         """Should parse valid JSON response from Ollama."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status = MagicMock()
-        mock_response.json.return_value = {
-            "response": json.dumps(
-                {
-                    "invoice_number": "12345",
-                    "invoice_date": "2024-01-15",
-                    "due_date": None,
-                    "supplier_name": "Test Supplier",
-                    "supplier_address": "123 Main St",
-                    "customer_name": "Test Customer",
-                    "subtotal": 100.0,
-                    "tax_amount": 10.0,
-                    "total_amount": 110.0,
-                    "currency": "USD",
-                }
-            )
-        }
+        ollama_stub.output = json.dumps(
+            {
+                "invoice_number": "12345",
+                "invoice_date": "2024-01-15",
+                "due_date": None,
+                "supplier_name": "Test Supplier",
+                "supplier_address": "123 Main St",
+                "customer_name": "Test Customer",
+                "subtotal": 100.0,
+                "tax_amount": 10.0,
+                "total_amount": 110.0,
+                "currency": "USD",
+            }
+        )
+
+        result = served_provider.extract_invoice_fields("Invoice #12345...")
+        assert result.success is True
+        assert result.provider == "ollama"
+        assert result.invoice_data is not None
+        assert result.invoice_data.invoice_number == "12345"
+        assert result.invoice_data.supplier_name == "Test Supplier"
 
-        with patch.object(provider._client, "post", return_value=mock_response):
-            result = provider.extract_invoice_fields("Invoice #12345...")
-            assert result.success is True
-            assert result.provider == "ollama"
-            assert result.invoice_data is not None
-            assert result.invoice_data.invoice_number == "12345"
-            assert result.invoice_data.supplier_name == "Test Supplier"
+    def test_extract_uses_format_json(
+        self, ollama_stub: _OllamaStub, served_provider: OllamaExtractionProvider
+    ) -> None:
+        """Should request structured JSON output matching the invoice fields."""
+        ollama_stub.output = json.dumps({"invoice_number": "1"})
+
+        served_provider.extract_invoice_fields("Invoice #1")
+
+        body = json.loads(ollama_stub.requests[0].content)
+        assert body["format"]["type"] == "object"
+        assert "invoice_number" in body["format"]["properties"]
+        assert "total_amount" in body["format"]["required"]
+
+    def test_extract_streaming_stops_after_object(
+        self, settings: Settings, ollama_stub: _OllamaStub
+    ) -> None:
+        """Should stop reading streamed output once the JSON object is complete."""
+        provider = OllamaExtractionProvider(
+            settings.model_copy(update={"ollama_stream": True}),
+            transport=httpx.MockTransport(ollama_stub.handle),
+        )
+        ollama_stub.stream_chunks = ['{"invoice_number": ', '"A}1"', "}", " Trailing", " prose"]
+
+        result = provider.extract_invoice_fields("Invoice #1")
+
+        assert result.success is True
+        assert result.invoice_data is not None
+        assert result.invoice_data.invoice_number == "A}1"
+        assert ollama_stub.chunks_sent == 3
+
+    def test_extract_reuses_client(
+        self, ollama_stub: _OllamaStub, served_provider: OllamaExtractionProvider
+    ) -> None:
+        """Should send every request through the same pooled client."""
+        client = served_provider._client
+        ollama_stub.output = json.dumps({"invoice_number": "1"})
+
+        assert served_provider.extract_invoice_fields("Invoice #1").success is True
+        assert served_provider.extract_invoice_fields("Invoice #2").success is True
+
+        assert served_provider._client is client
+        assert [r.url.path for r in ollama_stub.requests] == ["/api/generate"] * 2
+
+    def test_extract_caches_repeated_text(
+        self, ollama_stub: _OllamaStub, served_provider: OllamaExtractionProvider
+    ) -> None:
+        """Should reuse the result for identical OCR text instead of calling Ollama again."""
+        ollama_stub.output = json.dumps({"invoice_number": "1"})
+
+        first = served_provider.extract_invoice_fields("Invoice #1")
+        second = served_provider.extract_invoice_fields("Invoice #1")
+
+        assert len(ollama_stub.requests) == 1
+        assert second == first
+        assert second is not first
+
+    def test_extract_cached_result_isolated_from_callers(
+        self, ollama_stub: _OllamaStub, served_provider: OllamaExtractionProvider
+    ) -> None:
+        """Should not let a caller's changes reach later cache hits."""
+        ollama_stub.output = json.dumps({"invoice_number": "1"})
+
+        first = served_provider.extract_invoice_fields("Invoice #1")
+        assert first.invoice_data is not None
+        first.invoice_data.invoice_number = "changed"
+        second = served_provider.extract_invoice_fields("Invoice #1")
+        assert second.invoice_data is not None
+        second.invoice_data.supplier_name = "changed"
+        third = served_provider.extract_invoice_fields("Invoice #1")
+
+        assert third.invoice_data is not None
+        assert third.invoice_data.invoice_number == "1"
+        assert third.invoice_data.supplier_name is None
+
+    def test_extract_does_not_cache_failures(
+        self, ollama_stub: _OllamaStub, served_provider: OllamaExtractionProvider
+    ) -> None:
+        """Should call Ollama again after a failed extraction."""
+        ollama_stub.output = "not json"
+
+        assert served_provider.extract_invoice_fields("Invoice #1").success is False
+        assert served_provider.extract_invoice_fields("Invoice #1").success is False
+
+        assert len(ollama_stub.requests) == 2
+
+    def test_extract_cache_disabled(self, settings: Settings, ollama_stub: _OllamaStub) -> None:
+        """Should call Ollama every time when the cache size is 0."""
+        provider = OllamaExtractionProvider(
+            settings.model_copy(update={"ollama_cache_size": 0}),
+            transport=httpx.MockTransport(ollama_stub.handle),
+        )
+        ollama_stub.output = json.dumps({"invoice_number": "1"})
 
-    def test_extract_json_in_markdown_block(self, provider: OllamaExtractionProvider) -> None:
+        provider.extract_invoice_fields("Invoice #1")
+        provider.extract_invoice_fields("Invoice #1")
+
+        assert len(ollama_stub.requests) == 2
+
+    def test_context_manager_closes_client(self, settings: Settings) -> None:
+        """Should close the HTTP client when leaving the context."""
+        with OllamaExtractionProvider(settings) as provider:
+            assert provider._client.is_closed is False
+
+        assert provider._client.is_closed is True
+
+    def test_extract_json_in_markdown_block(
+        self, ollama_stub: _OllamaStub, served_provider: OllamaExtractionProvider
+    ) -> None:
         """Should parse JSON wrapped in markdown code block."""
         json_data = {
             "invoice_number": "67890",
             "invoice_date": "2024-02-20",
             "total_amount": 500.0,
         }
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status = MagicMock()
-        mock_response.json.return_value = {"response": f"```json\n{json.dumps(json_data)}\n```"}
+        ollama_stub.output = f"```json\n{json.dumps(json_data)}\n```"
 
-        with patch.object(provider._client, "post", return_value=mock_response):
-            result = provider.extract_invoice_fields("Invoice text...")
-            assert result.success is True
-            assert result.invoice_data is not None
-            assert result.invoice_data.invoice_number == "67890"
+        result = served_provider.extract_invoice_fields("Invoice text...")
+        assert result.success is True
+        assert result.invoice_data is not None
+        assert result.invoice_data.invoice_number == "67890"
 
-    def test_extract_invalid_json_returns_error(self, provider: OllamaExtractionProvider) -> None:
+    def test_extract_invalid_json_returns_error(
+        self, ollama_stub: _OllamaStub, served_provider: OllamaExtractionProvider
+    ) -> None:
         """Should return error when Ollama returns invalid JSON."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status = MagicMock()
-        mock_response.json.return_value = {"response": "This is not valid JSON"}
+        ollama_stub.output = "This is not valid JSON"
 
-        with patch.object(provider._client, "post", return_value=mock_response):
-            result = provider.extract_invoice_fields("Invoice text...")
-            assert result.success is False
-            assert "JSON parsing failed" in str(result.error)
+        result = served_provider.extract_invoice_fields("Invoice text...")
+        assert result.success is False
+        assert "JSON parsing failed" in str(result.error)
 
-    def test_extract_http_error_returns_error(self, provider: OllamaExtractionProvider) -> None:
+    @pytest.mark.usefixtures("no_retry_wait")
+    def test_extract_http_error_returns_error(
+        self, ollama_stub: _OllamaStub, served_provider: OllamaExtractionProvider
+    ) -> None:
         """Should return error when HTTP request fails."""
-        with patch.object(
-            provider._client,
-            "post",
-            side_effect=httpx.HTTPStatusError(
-                "Server error", request=MagicMock(), response=MagicMock()
-            ),
-        ):
-            result = provider.extract_invoice_fields("Invoice text...")
-            assert result.success is False
-            assert "Extraction failed" in str(result.error)
+        ollama_stub.status_code = 500
+
+        result = served_provider.extract_invoice_fields("Invoice text...")
+        assert result.success is False
+        assert "Extraction failed" in str(result.error)
+        assert len(ollama_stub.requests) == 3  # Retried before giving up
 
 
 class TestJsonParsing:
@@ -175,6 +352,12 @@ class TestJsonParsing:
         result = provider._parse_json_response(response)
         assert result == {"invoice_number": "789"}
 
+    def test_parse_json_stops_at_end_of_object(self, provider: OllamaExtractionProvider) -> None:
+        """Should ignore braces in strings and in text after the JSON object."""
+        response = '{"invoice_number": "A}1", "notes": {"k": 1}} (fields in {braces})'
+        result = provider._parse_json_response(response)
+        assert result == {"invoice_number": "A}1", "notes": {"k": 1}}
+
     def test_parse_invalid_json_raises(self, provider: OllamaExtractionProvider) -> None:
         """Should raise JSONDecodeError for invalid JSON."""
         with pytest.raises(json.JSONDecodeError):
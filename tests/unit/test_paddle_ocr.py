@@ -31,6 +31,17 @@ class TestPaddleOCRService:
         # PaddleOCR is installed in this test environment
         assert service.is_available() is True
 
+    def test_is_available_does_not_import_paddleocr(self, settings: Settings) -> None:
+        """Should check availability without importing PaddleOCR."""
+        service = PaddleOCRService(settings)
+
+        with (
+            patch("services.ocr.paddle_service.find_spec", return_value=object()),
+            patch.dict("sys.modules", {"paddleocr": None}),
+        ):
+            # A None entry in sys.modules makes any import of paddleocr fail
+            assert service.is_available() is True
+
     def test_extract_text_file_not_found(self, settings: Settings) -> None:
         """Should return error for non-existent file."""
         service = PaddleOCRService(settings)
@@ -42,12 +53,11 @@ class TestPaddleOCRService:
         """Should extract text successfully with mocked PaddleOCR."""
         service = PaddleOCRService(settings)
 
-        # Mock the OCR result
-        mock_ocr_result = MagicMock()
-        mock_ocr_result.get.side_effect = lambda key, default=None: {
+        # PaddleOCR v3.x results are dict-like, so a plain dict stands in for one
+        mock_ocr_result = {
             "rec_texts": ["Invoice #12345", "Total: $100.00"],
             "rec_scores": [0.95, 0.98],
-        }.get(key, default)
+        }
 
         mock_ocr = MagicMock()
         mock_ocr.ocr.return_value = [mock_ocr_result]
@@ -59,6 +69,8 @@ class TestPaddleOCRService:
 
         assert result.success is True
         assert "Invoice #12345" in result.text
+        # One line per recognized text box, joined without a trailing newline
+        assert result.text == "Invoice #12345\nTotal: $100.00"
         assert result.confidence == pytest.approx(0.965, rel=0.01)
 
     def test_extract_text_empty_result(self, settings: Settings) -> None:
@@ -75,12 +87,65 @@ class TestPaddleOCRService:
         assert result.success is True
         assert result.text == ""
 
+    def test_extract_text_batch_single_ocr_call(self, settings: Settings, tmp_path: Path) -> None:
+        """Should recognize all pages with one PaddleOCR call, in input order."""
+        service = PaddleOCRService(settings)
+        paths = [tmp_path / f"page{i}.png" for i in range(3)]
+        for path in paths:
+            path.write_bytes(b"")
+
+        mock_ocr = MagicMock()
+        mock_ocr.ocr.return_value = [
+            {"rec_texts": [f"Page {i}"], "rec_scores": [0.9]} for i in range(3)
+        ]
+
+        with patch.object(service, "_get_ocr", return_value=mock_ocr):
+            results = service.extract_text_batch(paths)
+
+        assert mock_ocr.ocr.call_count == 1
+        mock_ocr.ocr.assert_called_once_with([str(path) for path in paths])
+        assert [r.text for r in results] == ["Page 0", "Page 1", "Page 2"]
+        assert all(r.success for r in results)
+
+    def test_extract_text_batch_missing_file(self, settings: Settings, tmp_path: Path) -> None:
+        """Should report missing pages without sending them to PaddleOCR."""
+        service = PaddleOCRService(settings)
+        page = tmp_path / "page.png"
+        page.write_bytes(b"")
+        missing = tmp_path / "missing.png"
+
+        mock_ocr = MagicMock()
+        mock_ocr.ocr.return_value = [None]
+
+        with patch.object(service, "_get_ocr", return_value=mock_ocr):
+            results = service.extract_text_batch([missing, page])
+
+        mock_ocr.ocr.assert_called_once_with([str(page)])
+        assert results[0].success is False
+        assert "not found" in str(results[0].error).lower()
+        assert results[1].success is True
+        assert results[1].text == ""
+
     def test_lazy_loading(self, settings: Settings) -> None:
         """Should not load model until first extraction."""
         service = PaddleOCRService(settings)
         # Model should not be loaded yet
         assert service._ocr is None
 
+    def test_engine_shared_across_instances(self, settings: Settings) -> None:
+        """Should load the PaddleOCR engine once for all service instances."""
+        mock_paddleocr = MagicMock()
+
+        with (
+            patch.dict("sys.modules", {"paddleocr": mock_paddleocr}),
+            patch.dict("services.ocr.paddle_service._OCR_ENGINES", clear=True),
+        ):
+            first = PaddleOCRService(settings)._get_ocr()
+            second = PaddleOCRService(settings)._get_ocr()
+
+        assert first is second
+        mock_paddleocr.PaddleOCR.assert_called_once_with(lang="en")
+
     def test_environment_configured(self, settings: Settings) -> None:
         """Should set DISABLE_MODEL_SOURCE_CHECK environment variable."""
         import os
@@ -1,10 +1,16 @@
 """Unit tests for StorageService (MinIO/S3-compatible storage).
 
 Tests storage operations with mocked MinIO client.
+
+No real I/O happens here, so runtime is interpreter overhead: keep fixtures
+shared, mocks lightweight and per-test patching minimal.
 """
 
+from collections.abc import Callable
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock, call
 
 import pytest
 from minio.error import S3Error
@@ -12,11 +18,35 @@ from minio.error import S3Error
 from services.shared.config import Settings
 from services.storage.service import StorageService
 
+# Path that never exists, for the missing file test
+_NONEXISTENT_PATH = Path("/nonexistent/file.pdf")
 
-@pytest.fixture
+# HTTP response attached to the S3 errors below, shared by all of them
+_NOT_FOUND_RESPONSE = SimpleNamespace(status=404, data=b"")
+
+
+def _s3_error(code: str, message: str, resource: str) -> S3Error:
+    """Build an S3Error like the one MinIO raises for a 404 response."""
+    return S3Error(
+        code=code,
+        message=message,
+        resource=resource,
+        request_id="12345",
+        host_id="host",
+        response=_NOT_FOUND_RESPONSE,  # type: ignore[arg-type]
+    )
+
+
+# S3 errors raised by the mock client, built once at import
+_NO_SUCH_KEY_ERROR = _s3_error("NoSuchKey", "Object not found", "/test-bucket/doc-123")
+_NO_SUCH_BUCKET_ERROR = _s3_error("NoSuchBucket", "Bucket does not exist", "/test-bucket")
+
+
+@pytest.fixture(scope="session")
 def storage_settings() -> Settings:
-    """Create test settings with storage enabled."""
+    """Create test settings with storage enabled (shared, treat as read-only)."""
     return Settings(
+        _env_file=None,
         storage_enabled=True,
         storage_endpoint="localhost:9000",
         storage_access_key="test-access-key",
@@ -26,28 +56,76 @@ def storage_settings() -> Settings:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def disabled_storage_settings() -> Settings:
-    """Create test settings with storage disabled."""
-    return Settings(storage_enabled=False)
+    """Create test settings with storage disabled (shared, treat as read-only)."""
+    return Settings(_env_file=None, storage_enabled=False)
 
 
-@pytest.fixture
-def mock_minio_client() -> MagicMock:
-    """Create mock MinIO client."""
-    mock = MagicMock()
+def _set_minio_defaults(mock: MagicMock) -> None:
+    """Configure the default responses of a mock MinIO client."""
     mock.bucket_exists.return_value = True
     mock.list_buckets.return_value = []
+
+
+@pytest.fixture(scope="session")
+def mock_minio_client() -> MagicMock:
+    """Create mock MinIO client shared by all tests (reset before each one)."""
+    mock = MagicMock()
+    _set_minio_defaults(mock)
     return mock
 
 
+@pytest.fixture(scope="session")
+def pdf_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Write a small test file once for all file upload tests (treat as read-only).
+
+    upload_file needs a real path: it stats the file and MinIO reads it.
+    """
+    path = tmp_path_factory.mktemp("storage") / "test.pdf"
+    path.write_bytes(b"PDF content")
+    return path
+
+
+@pytest.fixture(scope="session")
+def shared_storage_service(
+    storage_settings: Settings, mock_minio_client: MagicMock
+) -> StorageService:
+    """Create storage service built once for the session.
+
+    The mock MinIO client is installed as the lazily created client, so
+    _get_client returns it without a per-test patch.
+    """
+    service = StorageService(storage_settings)
+    service._client = mock_minio_client
+    return service
+
+
+@pytest.fixture
+def storage_service(shared_storage_service: StorageService) -> StorageService:
+    """Shared storage service using the mock MinIO client.
+
+    The bucket cache is cleared so each test sees bucket_exists checks.
+    """
+    shared_storage_service._bucket_exists_cache.clear()
+    return shared_storage_service
+
+
+@pytest.fixture(autouse=True)
+def reset_minio_client(mock_minio_client: MagicMock) -> None:
+    """Clear calls and per-test responses from the shared mock MinIO client."""
+    mock_minio_client.reset_mock(return_value=True, side_effect=True)
+    _set_minio_defaults(mock_minio_client)
+
+
 class TestStorageServiceAvailability:
     """Test storage service availability checks."""
 
-    def test_is_available_when_enabled_and_configured(self, storage_settings: Settings) -> None:
+    def test_is_available_when_enabled_and_configured(
+        self, shared_storage_service: StorageService
+    ) -> None:
         """Should return True when storage is enabled and credentials are set."""
-        service = StorageService(storage_settings)
-        assert service.is_available() is True
+        assert shared_storage_service.is_available() is True
 
     def test_is_not_available_when_disabled(self, disabled_storage_settings: Settings) -> None:
         """Should return False when storage is disabled."""
@@ -79,25 +157,19 @@ class TestStorageServiceHealthCheck:
     """Test storage service health checks."""
 
     def test_health_check_success(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
+        self, storage_service: StorageService, mock_minio_client: MagicMock
     ) -> None:
         """Should return True when MinIO is reachable."""
-        service = StorageService(storage_settings)
-
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            assert service.health_check() is True
+        assert storage_service.health_check() is True
 
-        mock_minio_client.list_buckets.assert_called_once()
+        assert mock_minio_client.list_buckets.call_count == 1
 
     def test_health_check_failure(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
+        self, storage_service: StorageService, mock_minio_client: MagicMock
     ) -> None:
         """Should return False when MinIO is not reachable."""
         mock_minio_client.list_buckets.side_effect = Exception("Connection refused")
-        service = StorageService(storage_settings)
-
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            assert service.health_check() is False
+        assert storage_service.health_check() is False
 
     def test_health_check_when_disabled(self, disabled_storage_settings: Settings) -> None:
         """Should return False when storage is disabled."""
@@ -109,18 +181,15 @@ class TestStorageServiceUpload:
     """Test storage upload operations."""
 
     def test_upload_bytes_success(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
+        self, storage_service: StorageService, mock_minio_client: MagicMock
     ) -> None:
         """Should upload bytes successfully."""
-        mock_minio_client.put_object.return_value = MagicMock(etag="abc123")
-
-        service = StorageService(storage_settings)
+        mock_minio_client.put_object.return_value = SimpleNamespace(etag="abc123")
 
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            result = service.upload_bytes(
-                data=b"test data",
-                object_name="doc-123/invoice.pdf",
-            )
+        result = storage_service.upload_bytes(
+            data=b"test data",
+            object_name="doc-123/invoice.pdf",
+        )
 
         assert result.success is True
         assert result.object_name == "doc-123/invoice.pdf"
@@ -129,78 +198,46 @@ class TestStorageServiceUpload:
         assert result.size == 9
 
     def test_upload_bytes_creates_bucket_if_missing(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
+        self, storage_service: StorageService, mock_minio_client: MagicMock
     ) -> None:
         """Should create bucket if it doesn't exist."""
         mock_minio_client.bucket_exists.return_value = False
-        mock_minio_client.put_object.return_value = MagicMock(etag="abc123")
-
-        service = StorageService(storage_settings)
+        mock_minio_client.put_object.return_value = SimpleNamespace(etag="abc123")
 
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            result = service.upload_bytes(
-                data=b"test data",
-                object_name="doc-123/invoice.pdf",
-            )
+        result = storage_service.upload_bytes(
+            data=b"test data",
+            object_name="doc-123/invoice.pdf",
+        )
 
         assert result.success is True
-        mock_minio_client.make_bucket.assert_called_once_with("test-documents")
+        assert mock_minio_client.make_bucket.call_args_list == [call("test-documents")]
 
-    def test_upload_bytes_s3_error(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
+    def test_upload_file_not_found(
+        self, storage_service: StorageService, mock_minio_client: MagicMock
     ) -> None:
-        """Should handle S3 errors gracefully."""
-        mock_minio_client.put_object.side_effect = S3Error(
-            code="NoSuchBucket",
-            message="Bucket does not exist",
-            resource="/test-bucket",
-            request_id="12345",
-            host_id="host",
-            response=MagicMock(status=404, data=b""),
-        )
-
-        service = StorageService(storage_settings)
-
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            result = service.upload_bytes(
-                data=b"test data",
-                object_name="doc-123/invoice.pdf",
-            )
-
-        assert result.success is False
-        assert "S3 error" in str(result.error)
-
-    def test_upload_file_not_found(self, storage_settings: Settings) -> None:
         """Should handle missing file gracefully."""
-        service = StorageService(storage_settings)
-        result = service.upload_file(
-            file_path=Path("/nonexistent/file.pdf"),
+        result = storage_service.upload_file(
+            file_path=_NONEXISTENT_PATH,
             object_name="doc-123/invoice.pdf",
         )
 
         assert result.success is False
         assert "not found" in str(result.error).lower()
+        assert mock_minio_client.fput_object.call_count == 0
 
     def test_upload_file_success(
         self,
-        storage_settings: Settings,
+        storage_service: StorageService,
         mock_minio_client: MagicMock,
-        tmp_path: Path,
+        pdf_file: Path,
     ) -> None:
         """Should upload file successfully."""
-        # Create test file
-        test_file = tmp_path / "test.pdf"
-        test_file.write_bytes(b"PDF content")
-
-        mock_minio_client.fput_object.return_value = MagicMock(etag="file123")
+        mock_minio_client.fput_object.return_value = SimpleNamespace(etag="file123")
 
-        service = StorageService(storage_settings)
-
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            result = service.upload_file(
-                file_path=test_file,
-                object_name="doc-123/invoice.pdf",
-            )
+        result = storage_service.upload_file(
+            file_path=pdf_file,
+            object_name="doc-123/invoice.pdf",
+        )
 
         assert result.success is True
         assert result.etag == "file123"
@@ -211,113 +248,98 @@ class TestStorageServicePresignedUrl:
     """Test presigned URL generation."""
 
     def test_get_presigned_url_success(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
+        self, storage_service: StorageService, mock_minio_client: MagicMock
     ) -> None:
         """Should generate presigned URL successfully."""
         expected_url = "https://minio:9000/test-documents/doc-123/invoice.pdf?signature=abc"
         mock_minio_client.presigned_get_object.return_value = expected_url
 
-        service = StorageService(storage_settings)
-
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            result = service.get_presigned_url(
-                object_name="doc-123/invoice.pdf",
-                expires_seconds=7200,
-            )
+        result = storage_service.get_presigned_url(
+            object_name="doc-123/invoice.pdf",
+            expires_seconds=7200,
+        )
 
         assert result.success is True
         assert result.url == expected_url
         assert result.expires_in_seconds == 7200
 
-    def test_get_presigned_url_s3_error(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
-    ) -> None:
-        """Should handle S3 errors gracefully."""
-        mock_minio_client.presigned_get_object.side_effect = S3Error(
-            code="NoSuchKey",
-            message="Object not found",
-            resource="/test-bucket/doc-123",
-            request_id="12345",
-            host_id="host",
-            response=MagicMock(status=404, data=b""),
-        )
-
-        service = StorageService(storage_settings)
-
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            result = service.get_presigned_url(object_name="doc-123/invoice.pdf")
-
-        assert result.success is False
-        assert "S3 error" in str(result.error)
-
 
 class TestStorageServiceDelete:
     """Test storage delete operations."""
 
     def test_delete_object_success(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
+        self, storage_service: StorageService, mock_minio_client: MagicMock
     ) -> None:
         """Should delete object successfully."""
-        service = StorageService(storage_settings)
-
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            result = service.delete_object(object_name="doc-123/invoice.pdf")
+        result = storage_service.delete_object(object_name="doc-123/invoice.pdf")
 
         assert result.success is True
-        mock_minio_client.remove_object.assert_called_once()
-
-    def test_delete_object_s3_error(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
-    ) -> None:
-        """Should handle S3 errors gracefully."""
-        mock_minio_client.remove_object.side_effect = S3Error(
-            code="NoSuchKey",
-            message="Object not found",
-            resource="/test-bucket/doc-123",
-            request_id="12345",
-            host_id="host",
-            response=MagicMock(status=404, data=b""),
-        )
-
-        service = StorageService(storage_settings)
-
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            result = service.delete_object(object_name="doc-123/invoice.pdf")
-
-        assert result.success is False
+        assert mock_minio_client.remove_object.call_count == 1
 
 
 class TestStorageServiceObjectExists:
     """Test object existence checks."""
 
     def test_object_exists_true(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
+        self, storage_service: StorageService, mock_minio_client: MagicMock
     ) -> None:
         """Should return True when object exists."""
-        mock_minio_client.stat_object.return_value = MagicMock()
-
-        service = StorageService(storage_settings)
-
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            assert service.object_exists("doc-123/invoice.pdf") is True
-
-    def test_object_exists_false(
-        self, storage_settings: Settings, mock_minio_client: MagicMock
+        mock_minio_client.stat_object.return_value = SimpleNamespace()
+
+        assert storage_service.object_exists("doc-123/invoice.pdf") is True
+
+
+class TestStorageServiceS3Errors:
+    """Test that S3 errors from MinIO are reported rather than raised."""
+
+    @pytest.mark.parametrize(
+        ("method_name", "error", "operation"),
+        [
+            pytest.param(
+                "put_object",
+                _NO_SUCH_BUCKET_ERROR,
+                lambda s: s.upload_bytes(data=b"test data", object_name="doc-123/invoice.pdf"),
+                id="upload_bytes",
+            ),
+            pytest.param(
+                "presigned_get_object",
+                _NO_SUCH_KEY_ERROR,
+                lambda s: s.get_presigned_url(object_name="doc-123/invoice.pdf"),
+                id="get_presigned_url",
+            ),
+            pytest.param(
+                "remove_object",
+                _NO_SUCH_KEY_ERROR,
+                lambda s: s.delete_object(object_name="doc-123/invoice.pdf"),
+                id="delete_object",
+            ),
+            pytest.param(
+                "stat_object",
+                _NO_SUCH_KEY_ERROR,
+                lambda s: s.object_exists("doc-123/invoice.pdf"),
+                id="object_exists",
+            ),
+        ],
+    )
+    def test_s3_error_handled(
+        self,
+        storage_service: StorageService,
+        mock_minio_client: MagicMock,
+        method_name: str,
+        error: S3Error,
+        operation: Callable[[StorageService], Any],
     ) -> None:
-        """Should return False when object doesn't exist."""
-        mock_minio_client.stat_object.side_effect = S3Error(
-            code="NoSuchKey",
-            message="Object not found",
-            resource="/test-bucket/doc-123",
-            request_id="12345",
-            host_id="host",
-            response=MagicMock(status=404, data=b""),
-        )
+        """Should handle S3 errors gracefully."""
+        getattr(mock_minio_client, method_name).side_effect = error
 
-        service = StorageService(storage_settings)
+        outcome = operation(storage_service)
 
-        with patch.object(service, "_get_client", return_value=mock_minio_client):
-            assert service.object_exists("doc-123/invoice.pdf") is False
+        # object_exists reports a plain bool; the others return a result model
+        if isinstance(outcome, bool):
+            assert outcome is False
+        else:
+            assert outcome.success is False
+            assert "S3 error" in str(outcome.error)
 
 
 class TestStorageServiceContentType:
@@ -337,48 +359,35 @@ class TestStorageServiceContentType:
         result = StorageService._detect_content_type("data.unknown_ext_12345")
         assert result == "application/octet-stream"
 
+    def test_detect_content_type_uses_all_extensions(self) -> None:
+        """Should detect types that depend on more than the last extension."""
+        assert StorageService._detect_content_type("backup.tar.gz") == "application/x-tar"
+
 
 class TestStorageSettingsConfiguration:
     """Test storage settings via environment variables."""
 
-    def test_default_storage_disabled(self) -> None:
+    def test_default_storage_disabled(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Storage should be disabled by default when no env vars set."""
-        import os
-
         # Clear any existing storage env vars to test true defaults
-        env_backup = {}
-        storage_vars = [
+        for var in (
             "APP_STORAGE_ENABLED",
             "APP_STORAGE_ENDPOINT",
             "APP_STORAGE_ACCESS_KEY",
             "APP_STORAGE_SECRET_KEY",
-        ]
-        for var in storage_vars:
-            if var in os.environ:
-                env_backup[var] = os.environ.pop(var)
-
-        try:
-            # Create settings without .env file influence
-            settings = Settings(_env_file=None)
-            assert settings.storage_enabled is False
-        finally:
-            # Restore env vars
-            os.environ.update(env_backup)
-
-    def test_storage_settings_from_env(self) -> None:
+        ):
+            monkeypatch.delenv(var, raising=False)
+
+        # Create settings without .env file influence
+        assert Settings(_env_file=None).storage_enabled is False
+
+    def test_storage_settings_from_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Should read storage settings from environment."""
-        import os
-
-        os.environ["APP_STORAGE_ENABLED"] = "true"
-        os.environ["APP_STORAGE_ENDPOINT"] = "minio.example.com:9000"
-        os.environ["APP_STORAGE_BUCKET"] = "my-docs"
-
-        try:
-            settings = Settings(_env_file=None)
-            assert settings.storage_enabled is True
-            assert settings.storage_endpoint == "minio.example.com:9000"
-            assert settings.storage_bucket == "my-docs"
-        finally:
-            del os.environ["APP_STORAGE_ENABLED"]
-            del os.environ["APP_STORAGE_ENDPOINT"]
-            del os.environ["APP_STORAGE_BUCKET"]
+        monkeypatch.setenv("APP_STORAGE_ENABLED", "true")
+        monkeypatch.setenv("APP_STORAGE_ENDPOINT", "minio.example.com:9000")
+        monkeypatch.setenv("APP_STORAGE_BUCKET", "my-docs")
+
+        settings = Settings(_env_file=None)
+        assert settings.storage_enabled is True
+        assert settings.storage_endpoint == "minio.example.com:9000"
+        assert settings.storage_bucket == "my-docs"